@@ -5,20 +5,53 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import io
 from datetime import datetime, timedelta
-import warnings
+from typing import Dict, Tuple
 
 # 导入自定义模块
 from data_processor import DataProcessor
 from hedge_ratio_calculator import HedgeRatioCalculator
-from backtest_engine import BacktestEngine, HedgeDirection
-from visualizer import Visualizer
-from stress_test import StressTestAnalyzer
-
-warnings.filterwarnings('ignore')
+from backtest_engine import BacktestEngine, HedgeDirection, aggregate_period_metrics
+# visualizer（plotly/pyecharts）和stress_test在首次使用时再导入，缩短冷启动时间
+
+# 页脚与各选项卡标题（静态HTML常量）
+_FOOTER_HTML = """
+<div style='text-align: center; color: #666; padding: 20px;'>
+    <p>📊 期货套保策略分析工具 | 专业的套保效果评估平台</p>
+    <p style='font-size: 0.8em;'>本工具仅供学习和研究使用，投资决策请谨慎</p>
+</div>
+"""
+_SECTION_HEADERS = {
+    'upload': '<h2 class="section-header">📁 数据上传与处理</h2>',
+    'analysis': '<h2 class="section-header">📊 套保分析与计算</h2>',
+    'visualization': '<h2 class="section-header">📈 可视化分析</h2>',
+    'stress': '<h2 class="section-header">🧪 压力测试</h2>',
+    'export': '<h2 class="section-header">📋 结果导出</h2>'
+}
+
+# 侧边栏选项
+_HEDGE_OPTIONS = (
+    ("库存管理（现货多头）", HedgeDirection.SHORT_HEDGE),
+    ("采购管理（现货空头）", HedgeDirection.LONG_HEDGE)
+)
+_WINDOW_OPTIONS = {
+    "全部数据": None,
+    "近30天": 30,
+    "近60天": 60,
+    "近90天": 90,
+    "近120天": 120,
+    "近180天": 180,
+    "近360天": 360
+}
+_WINDOW_LABELS = tuple(_WINDOW_OPTIONS)
+
+# 压力时期对比图的聚合字段（求和 / 求均值 / 求最小值）
+_STRESS_SUM_FIELDS = ('total_hedged_pnl', 'total_unhedged_pnl', 'profitable_days_hedged',
+                      'profitable_days_unhedged', 'days')
+_STRESS_MEAN_FIELDS = ('avg_daily_hedged_pnl', 'avg_daily_unhedged_pnl', 'hedged_volatility',
+                       'unhedged_volatility')
+_STRESS_MIN_FIELDS = ('max_daily_loss_hedged', 'max_daily_loss_unhedged')
 
 # 页面配置
 st.set_page_config(
@@ -29,7 +62,7 @@ st.set_page_config(
 )
 
 # 自定义CSS
-st.markdown("""
+_CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -74,7 +107,148 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+# 注意：Streamlit每次rerun都会清空未重新渲染的元素，样式需每次输出（内容为模块常量，开销极小）
+st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
+
+
+def _option_label(option: Tuple) -> str:
+    """下拉选项 (显示名称, 取值) 的显示文本"""
+    return option[0]
+
+
+@st.cache_data(show_spinner=False)
+def _parse_spot_csv(raw: bytes) -> pd.DataFrame:
+    """
+    解析上传的现货CSV文件（按文件内容缓存，避免每次重新运行都重复解析）
+
+    Args:
+        raw: 上传文件的原始字节
+
+    Returns:
+        原始现货数据DataFrame
+    """
+    # pyarrow引擎直接读取字节，按类型多线程列式解析
+    return DataProcessor.read_spot_csv(io.BytesIO(raw))
+
+
+@st.cache_resource
+def _get_data_processor() -> DataProcessor:
+    """获取进程内共享的数据处理器"""
+    return DataProcessor()
+
+
+@st.cache_resource
+def _get_visualizer():
+    """获取进程内共享的可视化器（无状态，可跨会话复用；首次调用时才导入visualizer模块）"""
+    from visualizer import Visualizer
+    return Visualizer()
+
+
+def _ensure_stress_analyzer() -> None:
+    """按需创建会话级压力测试分析器（首次进入压力测试时才导入stress_test模块）"""
+    if 'stress_analyzer' not in st.session_state:
+        from stress_test import StressTestAnalyzer
+        st.session_state.stress_analyzer = StressTestAnalyzer()
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _cached_plot(kind: str, *args):
+    """
+    按输入内容缓存Plotly图表，输入未变化时重新运行直接复用已构建的图表
+
+    Args:
+        kind: 图表类型，对应Visualizer.plot_<kind>方法
+        *args: 传给绘图方法的参数
+
+    Returns:
+        Plotly图表对象（只读共享，不应原地修改）
+    """
+    return getattr(_get_visualizer(), f"plot_{kind}")(*args)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_future_data(future_code: str,
+                       start_date: pd.Timestamp,
+                       end_date: pd.Timestamp) -> Tuple[pd.DataFrame, str]:
+    """
+    获取期货数据（按合约代码和日期范围在内存中缓存1小时）
+
+    Args:
+        future_code: 期货合约代码
+        start_date: 开始日期
+        end_date: 结束日期
+
+    Returns:
+        (期货数据DataFrame, 提示信息)
+
+    Raises:
+        RuntimeError: 获取失败时抛出，失败结果不会被缓存
+    """
+    future_data, msg = _get_data_processor().get_future_data(future_code, start_date, end_date)
+    if future_data is None:
+        raise RuntimeError(msg)
+    return future_data, msg
+
+
+@st.cache_data(show_spinner=False)
+def _sample_csv() -> str:
+    """生成示例现货数据CSV（每个进程只生成一次）"""
+    sample_data = pd.DataFrame({
+        'date': pd.date_range('2023-01-01', periods=100, freq='D').strftime('%Y-%m-%d'),
+        'spot_price': np.random.default_rng(0).normal(68000, 500, 100).cumsum()
+    })
+    return sample_data.to_csv(index=False)
+
+
+def _render_summary_markdown(summary: Dict) -> str:
+    """
+    将绩效摘要渲染为分析报告中的Markdown段落（回测完成时渲染一次，生成报告时直接拼接）
+
+    Args:
+        summary: BacktestEngine.generate_performance_summary() 返回的绩效摘要
+
+    Returns:
+        绩效摘要Markdown文本
+    """
+    lines = ["## 绩效摘要\n"]
+    for category, metrics in summary.items():
+        lines.append(f"### {category}\n")
+        lines.extend(f"- {metric}：{value}" for metric, value in metrics.items())
+        lines.append("")
+    return "\n".join(lines)
+
+
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    将DataFrame直接编码写入字节缓冲区，避免先生成完整的str再编码为UTF-8（按数据内容缓存，重新运行不重复编码）
+
+    Args:
+        df: 待导出的数据
+
+    Returns:
+        CSV文件字节
+    """
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8')
+    return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def _to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """
+    将DataFrame序列化为Parquet字节（ZSTD压缩，列式存储，体积远小于CSV；按数据内容缓存，重新运行不重复编码）
+
+    Args:
+        df: 待导出的数据
+
+    Returns:
+        Parquet文件字节
+    """
+    buf = io.BytesIO()
+    df.to_parquet(buf, engine='pyarrow', compression='zstd', index=False)
+    return buf.getvalue()
 
 
 def main():
@@ -95,11 +269,8 @@ def main():
         # 套保方向
         hedge_direction = st.selectbox(
             "套保方向",
-            options=[
-                ("库存管理（现货多头）", HedgeDirection.SHORT_HEDGE),
-                ("采购管理（现货空头）", HedgeDirection.LONG_HEDGE)
-            ],
-            format_func=lambda x: x[0],
+            options=_HEDGE_OPTIONS,
+            format_func=_option_label,
             help="库存管理：持有现货，卖出期货对冲价格下跌风险；采购管理：计划采购现货，买入期货对冲价格上涨风险"
         )[1]
 
@@ -120,23 +291,13 @@ def main():
         )
 
         # 计算窗口
-        window_options = {
-            "全部数据": None,
-            "近30天": 30,
-            "近60天": 60,
-            "近90天": 90,
-            "近120天": 120,
-            "近180天": 180,
-            "近360天": 360
-        }
-
         selected_window = st.selectbox(
             "套保比例计算窗口",
-            options=list(window_options.keys()),
+            options=_WINDOW_LABELS,
             index=0,
             help="用于计算最优套保比例的历史数据窗口"
         )
-        window_size = window_options[selected_window]
+        window_size = _WINDOW_OPTIONS[selected_window]
 
         # 压力测试参数
         st.markdown("### 🧪 压力测试参数")
@@ -163,19 +324,17 @@ def main():
     ])
 
     # 初始化session state
+    # 无状态的处理器/可视化器跨会话共享；计算器、回测引擎和压力测试分析器保存了上次结果，按会话独立创建
+    # 可视化器和压力测试分析器在首次使用时才创建
     if 'data_processor' not in st.session_state:
-        st.session_state.data_processor = DataProcessor()
+        st.session_state.data_processor = _get_data_processor()
     if 'hedge_calculator' not in st.session_state:
         st.session_state.hedge_calculator = HedgeRatioCalculator()
     if 'backtest_engine' not in st.session_state:
         st.session_state.backtest_engine = BacktestEngine()
-    if 'visualizer' not in st.session_state:
-        st.session_state.visualizer = Visualizer()
-    if 'stress_analyzer' not in st.session_state:
-        st.session_state.stress_analyzer = StressTestAnalyzer()
 
     with tab1:
-        st.markdown('<h2 class="section-header">📁 数据上传与处理</h2>', unsafe_allow_html=True)
+        st.markdown(_SECTION_HEADERS['upload'], unsafe_allow_html=True)
 
         col1, col2 = st.columns([2, 1])
 
@@ -191,8 +350,7 @@ def main():
             if uploaded_file is not None:
                 try:
                     # 读取文件
-                    stringio = io.StringIO(uploaded_file.getvalue().decode('utf-8'))
-                    spot_data_raw = pd.read_csv(stringio)
+                    spot_data_raw = _parse_spot_csv(uploaded_file.getvalue())
 
                     st.success(f"✅ 文件读取成功，共 {len(spot_data_raw)} 行数据")
 
@@ -210,8 +368,8 @@ def main():
                     if st.button("验证和处理数据", type="primary"):
                         with st.spinner("正在处理数据..."):
                             handle_missing_map = {"删除": "drop", "线性插值": "interpolate"}
-                            spot_data, error_msg = st.session_state.data_processor.load_spot_data(
-                                uploaded_file, handle_missing_map[handle_missing]
+                            spot_data, error_msg = st.session_state.data_processor.process_spot_data(
+                                spot_data_raw, handle_missing_map[handle_missing]
                             )
 
                         if error_msg:
@@ -219,6 +377,7 @@ def main():
                         else:
                             st.success("✅ 数据处理成功！")
                             st.session_state.spot_data = spot_data
+                            st.session_state.spot_date_range = tuple(spot_data['date'].agg(['min', 'max']))
 
                             # 显示数据摘要
                             summary = st.session_state.data_processor.get_data_summary(spot_data)
@@ -260,21 +419,15 @@ def main():
 
             st.markdown("### 📥 示例数据下载")
             if st.button("下载示例数据"):
-                sample_data = pd.DataFrame({
-                    'date': pd.date_range('2023-01-01', periods=100, freq='D'),
-                    'spot_price': np.random.normal(68000, 500, 100).cumsum()
-                })
-                sample_data['date'] = sample_data['date'].dt.strftime('%Y-%m-%d')
-                csv = sample_data.to_csv(index=False)
                 st.download_button(
                     label="下载 spot_data_sample.csv",
-                    data=csv,
+                    data=_sample_csv(),
                     file_name="spot_data_sample.csv",
                     mime="text/csv"
                 )
 
     with tab2:
-        st.markdown('<h2 class="section-header">📊 套保分析与计算</h2>', unsafe_allow_html=True)
+        st.markdown(_SECTION_HEADERS['analysis'], unsafe_allow_html=True)
 
         if 'spot_data' not in st.session_state:
             st.warning("⚠️ 请先在数据上传页面加载现货数据")
@@ -285,14 +438,14 @@ def main():
             if st.button("获取期货数据并开始分析", type="primary"):
                 with st.spinner("正在获取期货数据..."):
                     try:
-                        # 获取现货数据的时间范围
-                        start_date = st.session_state.spot_data['date'].min().strftime('%Y-%m-%d')
-                        end_date = st.session_state.spot_data['date'].max().strftime('%Y-%m-%d')
+                        # 获取现货数据的时间范围（上传处理时已计算）
+                        start_date, end_date = st.session_state.spot_date_range
 
                         # 获取期货数据
-                        future_data, error_msg = st.session_state.data_processor.get_future_data(
-                            future_code, start_date, end_date
-                        )
+                        try:
+                            future_data, error_msg = _fetch_future_data(future_code, start_date, end_date)
+                        except RuntimeError as e:
+                            future_data, error_msg = None, str(e)
 
                         if error_msg and "缓存" not in error_msg:
                             st.error(f"❌ 期货数据获取失败：{error_msg}")
@@ -310,7 +463,7 @@ def main():
 
                             # 显示对齐后的数据预览
                             st.markdown("#### 对齐后的数据预览")
-                            st.dataframe(aligned_data.head(10))
+                            st.dataframe(aligned_data.head(10), use_container_width=True)
 
                             # 计算套保比例
                             st.markdown("### 套保比例计算")
@@ -352,9 +505,15 @@ def main():
                             st.session_state.backtest_results = backtest_results
                             st.success("✅ 历史回测完成！")
 
-                            # 显示回测摘要
+                            # 绩效摘要在回测完成时格式化一次，仪表板和详细结果表均复用
                             summary = st.session_state.backtest_engine.generate_performance_summary()
-                            st.session_state.visualizer.create_performance_dashboard(summary)
+                            st.session_state.performance_summary = summary
+                            from visualizer import build_summary_tables
+                            st.session_state.pnl_table, st.session_state.risk_table = build_summary_tables(summary)
+                            st.session_state.summary_md = _render_summary_markdown(summary)
+
+                            # 显示回测摘要
+                            _get_visualizer().create_performance_dashboard(summary)
 
                     except Exception as e:
                         st.error(f"❌ 分析过程出错：{str(e)}")
@@ -363,41 +522,16 @@ def main():
             if 'backtest_results' in st.session_state:
                 st.markdown("### 📈 详细分析结果")
 
-                backtest_results = st.session_state.backtest_results
-                metrics = backtest_results['performance_metrics']
-
                 # 盈亏分析
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.markdown("**盈亏表现**")
-                    pnl_data = {
-                        '指标': ['套保总盈亏', '未套保总盈亏', '套保优势',
-                                '平均每日盈亏(套保)', '平均每日盈亏(未套保)'],
-                        '数值': [
-                            f"{metrics['total_hedged_pnl']:.2f}",
-                            f"{metrics['total_unhedged_pnl']:.2f}",
-                            f"{metrics['total_hedged_pnl'] - metrics['total_unhedged_pnl']:.2f}",
-                            f"{metrics['avg_daily_hedged_pnl']:.2f}",
-                            f"{metrics['avg_daily_unhedged_pnl']:.2f}"
-                        ]
-                    }
-                    st.dataframe(pd.DataFrame(pnl_data), hide_index=True)
+                    st.dataframe(st.session_state.pnl_table, hide_index=True)
 
                 with col2:
                     st.markdown("**风险控制**")
-                    risk_data = {
-                        '指标': ['套保波动率', '未套保波动率', '波动率降低率',
-                                '最大回撤(套保)', '最大回撤(未套保)'],
-                        '数值': [
-                            f"{metrics['hedged_volatility']:.2f}",
-                            f"{metrics['unhedged_volatility']:.2f}",
-                            f"{metrics['volatility_reduction_rate']:.2%}",
-                            f"{metrics['max_drawdown_hedged']:.2f}",
-                            f"{metrics['max_drawdown_unhedged']:.2f}"
-                        ]
-                    }
-                    st.dataframe(pd.DataFrame(risk_data), hide_index=True)
+                    st.dataframe(st.session_state.risk_table, hide_index=True)
 
                 # 套保比例敏感性分析
                 st.markdown("### 📊 套保比例敏感性分析")
@@ -412,43 +546,45 @@ def main():
 
                 if 'sensitivity_data' in st.session_state:
                     # 敏感性分析结果
-                    sensitivity_fig = st.session_state.visualizer.plot_sensitivity_analysis(
-                        st.session_state.sensitivity_data, st.session_state.optimal_ratio
+                    sensitivity_fig = _cached_plot(
+                        'sensitivity_analysis', st.session_state.sensitivity_data, st.session_state.optimal_ratio
                     )
                     st.plotly_chart(sensitivity_fig, use_container_width=True)
 
     with tab3:
-        st.markdown('<h2 class="section-header">📈 可视化分析</h2>', unsafe_allow_html=True)
+        st.markdown(_SECTION_HEADERS['visualization'], unsafe_allow_html=True)
 
         if 'aligned_data' not in st.session_state:
             st.warning("⚠️ 请先完成套保分析")
         else:
             # 价格对比图
             st.markdown("### 价格走势对比")
-            price_fig = st.session_state.visualizer.plot_price_comparison(st.session_state.aligned_data)
+            price_fig = _cached_plot('price_comparison', st.session_state.aligned_data)
             st.plotly_chart(price_fig, use_container_width=True)
 
             # 盈亏对比图
             if 'backtest_results' in st.session_state:
                 st.markdown("### 盈亏对比分析")
-                pnl_fig = st.session_state.visualizer.plot_pnl_comparison(
-                    st.session_state.backtest_results['data']
+                pnl_fig = _cached_plot(
+                    'pnl_comparison', st.session_state.backtest_results['data']
                 )
                 st.plotly_chart(pnl_fig, use_container_width=True)
 
                 # 风险指标雷达图
                 st.markdown("### 风险指标对比")
-                radar_fig = st.session_state.visualizer.plot_risk_metrics_radar(
-                    st.session_state.backtest_results['performance_metrics']
+                radar_fig = _cached_plot(
+                    'risk_metrics_radar', st.session_state.backtest_results['performance_metrics']
                 )
                 st.plotly_chart(radar_fig, use_container_width=True)
 
     with tab4:
-        st.markdown('<h2 class="section-header">🧪 压力测试</h2>', unsafe_allow_html=True)
+        st.markdown(_SECTION_HEADERS['stress'], unsafe_allow_html=True)
 
         if 'backtest_results' not in st.session_state:
             st.warning("⚠️ 请先完成套保分析")
         else:
+            _ensure_stress_analyzer()
+
             st.markdown("### 压力测试配置")
 
             # 自动识别压力时期
@@ -467,9 +603,12 @@ def main():
 
                             # 显示压力时期
                             st.markdown("#### 识别到的压力时期")
-                            period_df = pd.DataFrame(stress_periods)
-                            st.dataframe(period_df[['start_date', 'end_date', 'duration_days', 'stress_type',
-                                                 'spot_price_change_pct', 'max_daily_spot_change']])
+                            # 只构建展示所需的列
+                            period_df = pd.DataFrame(stress_periods, columns=[
+                                'start_date', 'end_date', 'duration_days', 'stress_type',
+                                'spot_price_change_pct', 'max_daily_spot_change'
+                            ])
+                            st.dataframe(period_df, use_container_width=True)
 
                             # 运行压力测试
                             stress_results = st.session_state.stress_analyzer.run_stress_test(
@@ -547,22 +686,13 @@ def main():
 
                 if stress_results.get('stress_periods'):
                     # 聚合压力时期数据用于对比
-                    stress_agg = {
-                        'total_hedged_pnl': sum(p['total_hedged_pnl'] for p in stress_results['stress_periods']),
-                        'total_unhedged_pnl': sum(p['total_unhedged_pnl'] for p in stress_results['stress_periods']),
-                        'avg_daily_hedged_pnl': np.mean([p['avg_daily_hedged_pnl'] for p in stress_results['stress_periods']]),
-                        'avg_daily_unhedged_pnl': np.mean([p['avg_daily_unhedged_pnl'] for p in stress_results['stress_periods']]),
-                        'max_daily_loss_hedged': min(p['max_daily_loss_hedged'] for p in stress_results['stress_periods']),
-                        'max_daily_loss_unhedged': min(p['max_daily_loss_unhedged'] for p in stress_results['stress_periods']),
-                        'hedged_volatility': np.mean([p['hedged_volatility'] for p in stress_results['stress_periods']]),
-                        'unhedged_volatility': np.mean([p['unhedged_volatility'] for p in stress_results['stress_periods']]),
-                        'profitable_days_hedged': sum(p['profitable_days_hedged'] for p in stress_results['stress_periods']),
-                        'profitable_days_unhedged': sum(p['profitable_days_unhedged'] for p in stress_results['stress_periods']),
-                        'days': sum(p['days'] for p in stress_results['stress_periods'])
-                    }
-
-                    stress_fig = st.session_state.visualizer.plot_stress_test_results(
-                        stress_agg, normal_data
+                    stress_agg = aggregate_period_metrics(
+                        stress_results['stress_periods'],
+                        _STRESS_SUM_FIELDS, _STRESS_MEAN_FIELDS, _STRESS_MIN_FIELDS
+                    )
+
+                    stress_fig = _cached_plot(
+                        'stress_test_results', stress_agg, normal_data
                     )
                     st.plotly_chart(stress_fig, use_container_width=True)
 
@@ -573,7 +703,7 @@ def main():
                 st.markdown(report)
 
     with tab5:
-        st.markdown('<h2 class="section-header">📋 结果导出</h2>', unsafe_allow_html=True)
+        st.markdown(_SECTION_HEADERS['export'], unsafe_allow_html=True)
 
         if 'backtest_results' not in st.session_state:
             st.warning("⚠️ 暂无可导出的结果，请先完成分析")
@@ -585,24 +715,42 @@ def main():
                 st.markdown("#### 回测详细数据")
                 backtest_data = st.session_state.backtest_results['data']
 
-                csv_data = backtest_data.to_csv(index=False)
-                st.download_button(
-                    label="下载回测详细数据 (CSV)",
-                    data=csv_data,
-                    file_name=f"backtest_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="下载回测详细数据 (Parquet)",
+                        data=_to_parquet_bytes(backtest_data),
+                        file_name=f"backtest_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+                        mime="application/vnd.apache.parquet"
+                    )
+                with col2:
+                    st.download_button(
+                        label="下载回测详细数据 (CSV)",
+                        data=_to_csv_bytes(backtest_data),
+                        file_name=f"backtest_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv"
+                    )
 
             # 导出敏感性分析数据
             if 'sensitivity_data' in st.session_state:
                 st.markdown("#### 敏感性分析数据")
-                sensitivity_csv = st.session_state.sensitivity_data.to_csv(index=False)
-                st.download_button(
-                    label="下载敏感性分析数据 (CSV)",
-                    data=sensitivity_csv,
-                    file_name=f"sensitivity_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+                sensitivity_data = st.session_state.sensitivity_data
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="下载敏感性分析数据 (Parquet)",
+                        data=_to_parquet_bytes(sensitivity_data),
+                        file_name=f"sensitivity_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+                        mime="application/vnd.apache.parquet"
+                    )
+                with col2:
+                    st.download_button(
+                        label="下载敏感性分析数据 (CSV)",
+                        data=_to_csv_bytes(sensitivity_data),
+                        file_name=f"sensitivity_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv"
+                    )
 
             # 导出压力测试结果
             if 'stress_results' in st.session_state:
@@ -610,17 +758,26 @@ def main():
 
                 if st.button("导出压力测试结果"):
                     try:
-                        export_path = f"stress_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                        st.session_state.stress_analyzer.export_stress_test_results(export_path)
+                        export_name = f"stress_test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-                        # 读取并下载文件
-                        with open(export_path, 'r', encoding='utf-8-sig') as f:
-                            export_data = f.read()
+                        # 导出结果直接写入内存缓冲区，无需落盘
+                        parquet_buf = io.BytesIO()
+                        st.session_state.stress_analyzer.export_stress_test_results(parquet_buf, file_format="parquet")
+
+                        st.download_button(
+                            label="下载压力测试结果 (Parquet)",
+                            data=parquet_buf.getvalue(),
+                            file_name=f"{export_name}.parquet",
+                            mime="application/vnd.apache.parquet"
+                        )
+
+                        csv_buf = io.BytesIO()
+                        st.session_state.stress_analyzer.export_stress_test_results(csv_buf)
 
                         st.download_button(
                             label="下载压力测试结果 (CSV)",
-                            data=export_data,
-                            file_name=export_path,
+                            data=csv_buf.getvalue(),
+                            file_name=f"{export_name}.csv",
                             mime="text/csv"
                         )
                     except Exception as e:
@@ -636,19 +793,13 @@ def main():
                 report_sections.append(f"# 期货套保策略分析报告\n")
                 report_sections.append(f"生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 report_sections.append(f"## 分析参数\n")
-                report_sections.append(f"- 套保方向：{'库存管理（卖出套保）' if hedge_params['hedge_direction'] == 'short_hedge' else '采购管理（买入套保）'}")
-                report_sections.append(f"- 现货数量：{hedge_params['spot_quantity']}")
-                report_sections.append(f"- 最优套保比例：{hedge_params['hedge_ratio']:.4f}")
+                report_sections.append(f"- 套保方向：{'库存管理（卖出套保）' if hedge_params.hedge_direction == 'short_hedge' else '采购管理（买入套保）'}")
+                report_sections.append(f"- 现货数量：{hedge_params.spot_quantity}")
+                report_sections.append(f"- 最优套保比例：{hedge_params.hedge_ratio:.4f}")
                 report_sections.append(f"- 期货合约代码：{future_code}\n")
 
-                # 绩效摘要
-                summary = st.session_state.backtest_engine.generate_performance_summary()
-                report_sections.append(f"## 绩效摘要\n")
-                for category, metrics in summary.items():
-                    report_sections.append(f"### {category}\n")
-                    for metric, value in metrics.items():
-                        report_sections.append(f"- {metric}：{value}")
-                    report_sections.append("")
+                # 绩效摘要（回测完成时已渲染）
+                report_sections.append(st.session_state.summary_md)
 
                 # 压力测试结果
                 if 'stress_results' in st.session_state:
@@ -665,12 +816,7 @@ def main():
 
     # 页脚
     st.markdown("---")
-    st.markdown("""
-    <div style='text-align: center; color: #666; padding: 20px;'>
-        <p>📊 期货套保策略分析工具 | 专业的套保效果评估平台</p>
-        <p style='font-size: 0.8em;'>本工具仅供学习和研究使用，投资决策请谨慎</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
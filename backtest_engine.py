@@ -7,6 +7,279 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, Optional, List
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖，缺失时回退到NumPy实现
+    njit = None
+
+
+def _max_drawdown_loop(cumulative: np.ndarray) -> float:
+    """
+    单次遍历同时维护历史峰值与最大回撤
+
+    Args:
+        cumulative: 累计收益数组（非空）
+
+    Returns:
+        最大回撤值（非正数）
+    """
+    peak = cumulative[0]
+    max_drawdown = 0.0
+    for i in range(1, cumulative.shape[0]):
+        if cumulative[i] > peak:
+            peak = cumulative[i]
+        drawdown = cumulative[i] - peak
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+    return max_drawdown
+
+
+def _max_drawdown_numpy(cumulative: np.ndarray) -> float:
+    """NumPy向量化的最大回撤（未安装numba时使用）"""
+    return float(np.min(cumulative - np.maximum.accumulate(cumulative)))
+
+
+def _risk_metrics_loop(pnl: np.ndarray) -> Tuple[float, float, float, int]:
+    """
+    单次遍历同时计算总盈亏、样本标准差（Welford更新）、最大回撤（按累计盈亏）与盈利天数
+
+    Args:
+        pnl: 每日盈亏数组（不含NaN）
+
+    Returns:
+        (总盈亏, 样本标准差, 最大回撤, 盈利天数)；不足两个样本时标准差为NaN，空数组时最大回撤为NaN
+    """
+    n = pnl.shape[0]
+    if n == 0:
+        return 0.0, np.nan, np.nan, 0
+    total = 0.0
+    mean = 0.0
+    ssqdm = 0.0
+    profitable = 0
+    peak = pnl[0]
+    max_drawdown = 0.0
+    for i in range(n):
+        x = pnl[i]
+        if x > 0:
+            profitable += 1
+        # 标准差
+        delta = x - mean
+        mean += delta / (i + 1)
+        ssqdm += delta * (x - mean)
+        # 累计盈亏与最大回撤
+        total += x
+        if total > peak:
+            peak = total
+        drawdown = total - peak
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+    std = np.sqrt(max(ssqdm, 0.0) / (n - 1)) if n > 1 else np.nan
+    return total, std, max_drawdown, profitable
+
+
+def _risk_metrics_numpy(pnl: np.ndarray) -> Tuple[float, float, float, int]:
+    """NumPy实现的风险指标（未安装numba时使用）"""
+    n = pnl.size
+    if n == 0:
+        return 0.0, np.nan, np.nan, 0
+    std = float(pnl.std(ddof=1)) if n > 1 else np.nan
+    return float(pnl.sum()), std, _max_drawdown_numpy(np.cumsum(pnl)), int(np.count_nonzero(pnl > 0))
+
+
+# 平方偏差和不超过窗口平方和的该比例时视为零方差（加一减一更新的累计舍入误差）
+_ROLLING_VAR_EPS = 1e-14
+
+
+def _rolling_mean_std_loop(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    流式计算滚动均值与样本标准差（Welford加一减一更新，O(N)）
+
+    与pandas一致：窗口内数值全部相同时均值取该值、标准差为0，并清除此前累计的舍入误差
+
+    Args:
+        values: 输入数组（不含NaN）
+        window: 滚动窗口大小
+
+    Returns:
+        (滚动均值, 滚动标准差)，窗口未满的位置为NaN
+    """
+    n = values.shape[0]
+    means = np.full(n, np.nan)
+    stds = np.full(n, np.nan)
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    # 连续相同值的个数
+    same_run = 0
+    for i in range(n):
+        # 移出窗口外的旧值
+        if i >= window:
+            old = values[i - window]
+            nobs -= 1
+            if nobs == 0:
+                mean = 0.0
+                ssqdm = 0.0
+            else:
+                delta = old - mean
+                mean -= delta / nobs
+                ssqdm -= delta * (old - mean)
+        # 加入新值
+        x = values[i]
+        nobs += 1
+        delta = x - mean
+        mean += delta / nobs
+        ssqdm += delta * (x - mean)
+
+        same_run = same_run + 1 if i > 0 and x == values[i - 1] else 1
+        if same_run >= nobs:
+            # 窗口内全部为同一值：重置为精确状态
+            mean = x
+            ssqdm = 0.0
+        elif ssqdm <= _ROLLING_VAR_EPS * (ssqdm + nobs * mean * mean):
+            ssqdm = 0.0
+
+        if i >= window - 1:
+            means[i] = mean
+            if nobs > 1:
+                stds[i] = np.sqrt(max(ssqdm, 0.0) / (nobs - 1))
+    return means, stds
+
+
+def _rolling_corr_loop(x_values: np.ndarray, y_values: np.ndarray, window: int) -> np.ndarray:
+    """
+    流式计算滚动相关系数（同步维护均值、平方偏差和与协偏差和，O(N)）
+
+    Args:
+        x_values: 第一个输入数组（不含NaN）
+        y_values: 第二个输入数组（不含NaN）
+        window: 滚动窗口大小
+
+    Returns:
+        滚动相关系数，窗口未满或任一序列方差为零的位置为NaN
+    """
+    n = x_values.shape[0]
+    corrs = np.full(n, np.nan)
+    nobs = 0
+    mean_x = 0.0
+    mean_y = 0.0
+    ssq_x = 0.0
+    ssq_y = 0.0
+    cross = 0.0
+    # 两个序列各自连续相同值的个数
+    same_run_x = 0
+    same_run_y = 0
+    for i in range(n):
+        # 移出窗口外的旧值
+        if i >= window:
+            old_x = x_values[i - window]
+            old_y = y_values[i - window]
+            nobs -= 1
+            if nobs == 0:
+                mean_x = 0.0
+                mean_y = 0.0
+                ssq_x = 0.0
+                ssq_y = 0.0
+                cross = 0.0
+            else:
+                dx = old_x - mean_x
+                dy = old_y - mean_y
+                mean_x -= dx / nobs
+                mean_y -= dy / nobs
+                ssq_x -= dx * (old_x - mean_x)
+                ssq_y -= dy * (old_y - mean_y)
+                cross -= dx * (old_y - mean_y)
+        # 加入新值
+        x = x_values[i]
+        y = y_values[i]
+        nobs += 1
+        dx = x - mean_x
+        dy = y - mean_y
+        mean_x += dx / nobs
+        mean_y += dy / nobs
+        ssq_x += dx * (x - mean_x)
+        ssq_y += dy * (y - mean_y)
+        cross += dx * (y - mean_y)
+
+        # 某一序列窗口内全部为同一值时其方差与协偏差和精确为0
+        same_run_x = same_run_x + 1 if i > 0 and x == x_values[i - 1] else 1
+        same_run_y = same_run_y + 1 if i > 0 and y == y_values[i - 1] else 1
+        if same_run_x >= nobs:
+            mean_x = x
+            ssq_x = 0.0
+            cross = 0.0
+        if same_run_y >= nobs:
+            mean_y = y
+            ssq_y = 0.0
+            cross = 0.0
+
+        if i >= window - 1 and nobs > 1:
+            # 任一方差低于舍入误差量级时视为零方差，相关系数无定义
+            if (ssq_x > _ROLLING_VAR_EPS * (ssq_x + nobs * mean_x * mean_x)
+                    and ssq_y > _ROLLING_VAR_EPS * (ssq_y + nobs * mean_y * mean_y)):
+                corrs[i] = cross / np.sqrt(ssq_x * ssq_y)
+    return corrs
+
+
+def _rolling_mean_std_pandas(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """pandas实现的滚动均值与标准差（未安装numba时使用）"""
+    rolling = pd.Series(values).rolling(window=window)
+    return rolling.mean().to_numpy(), rolling.std().to_numpy()
+
+
+def _rolling_corr_pandas(x_values: np.ndarray, y_values: np.ndarray, window: int) -> np.ndarray:
+    """pandas实现的滚动相关系数（未安装numba时使用；单一序列零方差时pandas给出±inf，统一为NaN）"""
+    corrs = pd.Series(x_values).rolling(window=window).corr(pd.Series(y_values)).to_numpy()
+    corrs[np.isinf(corrs)] = np.nan
+    return corrs
+
+
+if njit is not None:
+    _max_drawdown_kernel = njit(cache=True)(_max_drawdown_loop)
+    _risk_metrics_kernel = njit(cache=True)(_risk_metrics_loop)
+    # 滚动内核释放GIL，可在线程池中并行执行
+    _rolling_mean_std_kernel = njit(cache=True, nogil=True)(_rolling_mean_std_loop)
+    _rolling_corr_kernel = njit(cache=True, nogil=True)(_rolling_corr_loop)
+else:
+    _max_drawdown_kernel = _max_drawdown_numpy
+    _risk_metrics_kernel = _risk_metrics_numpy
+    _rolling_mean_std_kernel = _rolling_mean_std_pandas
+    _rolling_corr_kernel = _rolling_corr_pandas
+
+# 数据量达到该行数且内核已编译（释放GIL）时，滚动指标改为多线程并行计算
+_PARALLEL_ROLLING_MIN_ROWS = 50_000
+
+
+def aggregate_period_metrics(period_results: List[Dict],
+                             sum_fields: Tuple[str, ...] = (),
+                             mean_fields: Tuple[str, ...] = (),
+                             min_fields: Tuple[str, ...] = ()) -> Dict[str, float]:
+    """
+    聚合多个时期的绩效结果（一次遍历打包为二维数组后按列归约）
+
+    Args:
+        period_results: 时期绩效结果列表（非空）
+        sum_fields: 求和的字段
+        mean_fields: 求均值的字段
+        min_fields: 求最小值的字段
+
+    Returns:
+        字段名到聚合值的字典
+    """
+    fields = sum_fields + mean_fields + min_fields
+    arr = np.fromiter(
+        (p[f] for p in period_results for f in fields),
+        dtype=np.float64, count=len(period_results) * len(fields)
+    ).reshape(len(period_results), len(fields))
+
+    n_sum = len(sum_fields)
+    n_mean = len(mean_fields)
+    aggregated = dict(zip(sum_fields, arr[:, :n_sum].sum(axis=0)))
+    aggregated.update(zip(mean_fields, arr[:, n_sum:n_sum + n_mean].mean(axis=0)))
+    aggregated.update(zip(min_fields, arr[:, n_sum + n_mean:].min(axis=0)))
+    return aggregated
 
 
 class HedgeDirection(Enum):
@@ -15,9 +288,91 @@ class HedgeDirection(Enum):
     SHORT_HEDGE = "short_hedge"  # 卖出套保（现货多头，期货空头）
 
 
+@dataclass(slots=True)
+class PerformanceMetrics:
+    """回测绩效指标"""
+    total_days: int  # 交易天数
+    total_hedged_pnl: float  # 套保总盈亏
+    total_unhedged_pnl: float  # 未套保总盈亏
+    total_spot_pnl: float  # 现货总盈亏
+    total_future_pnl: float  # 期货总盈亏
+    avg_daily_hedged_pnl: float  # 平均每日盈亏（套保）
+    avg_daily_unhedged_pnl: float  # 平均每日盈亏（未套保）
+    profitable_days_hedged: int  # 盈利天数（套保）
+    profitable_days_unhedged: int  # 盈利天数（未套保）
+    profitable_days_ratio_hedged: float  # 盈利天数占比（套保）
+    profitable_days_ratio_unhedged: float  # 盈利天数占比（未套保）
+    hedged_volatility: float  # 套保波动率
+    unhedged_volatility: float  # 未套保波动率
+    max_drawdown_hedged: float  # 最大回撤（套保）
+    max_drawdown_unhedged: float  # 最大回撤（未套保）
+    sharpe_ratio_hedged: float  # 夏普比率（套保）
+    sharpe_ratio_unhedged: float  # 夏普比率（未套保）
+    variance_reduction_rate: float  # 方差降低率
+    volatility_reduction_rate: float  # 波动率降低率
+    hedging_effectiveness: float  # 套保有效性
+    estimated_hedge_cost: float  # 估算套保成本
+    max_daily_gain_hedged: float  # 最大单日盈利（套保）
+    max_daily_loss_hedged: float  # 最大单日亏损（套保）
+    max_daily_gain_unhedged: float  # 最大单日盈利（未套保）
+    max_daily_loss_unhedged: float  # 最大单日亏损（未套保）
+    var_95_hedged: float  # VaR（95%，套保）
+    var_95_unhedged: float  # VaR（95%，未套保）
+    start_date: str  # 开始日期 (YYYY-MM-DD)
+    end_date: str  # 结束日期 (YYYY-MM-DD)
+
+    @property
+    def hedge_advantage(self) -> float:
+        """套保优势（套保总盈亏 - 未套保总盈亏）"""
+        return self.total_hedged_pnl - self.total_unhedged_pnl
+
+
+@dataclass(slots=True)
+class HedgeParameters:
+    """回测套保参数"""
+    hedge_ratio: float  # 套保比例
+    spot_quantity: float  # 现货数量
+    future_quantity: float  # 期货数量
+    hedge_direction: str  # 套保方向（HedgeDirection.value）
+    future_contract_size: float  # 期货合约规模
+
+
 class BacktestEngine:
     """历史回测引擎"""
 
+    # 各套保方向下的盈亏符号：(现货, 期货)
+    _PNL_SIGNS = {
+        HedgeDirection.SHORT_HEDGE: (1.0, -1.0),  # 卖出套保：现货多头，期货空头
+        HedgeDirection.LONG_HEDGE: (-1.0, 1.0)   # 买入套保：现货空头，期货多头
+    }
+
+    # 绩效摘要格式表：(分类, ((显示名称, 指标字段, 格式), ...))
+    _SUMMARY_FORMATS = (
+        ('盈亏表现', (
+            ('套保总盈亏', 'total_hedged_pnl', '.2f'),
+            ('未套保总盈亏', 'total_unhedged_pnl', '.2f'),
+            ('套保优势', 'hedge_advantage', '.2f'),
+            ('平均每日盈亏（套保）', 'avg_daily_hedged_pnl', '.2f'),
+            ('平均每日盈亏（未套保）', 'avg_daily_unhedged_pnl', '.2f')
+        )),
+        ('风险控制', (
+            ('套保波动率', 'hedged_volatility', '.2f'),
+            ('未套保波动率', 'unhedged_volatility', '.2f'),
+            ('波动率降低', 'volatility_reduction_rate', '.2%'),
+            ('最大回撤（套保）', 'max_drawdown_hedged', '.2f'),
+            ('最大回撤（未套保）', 'max_drawdown_unhedged', '.2f'),
+            ('套保有效性', 'hedging_effectiveness', '.2%')
+        )),
+        ('其他指标', (
+            ('盈利天数占比（套保）', 'profitable_days_ratio_hedged', '.2%'),
+            ('盈利天数占比（未套保）', 'profitable_days_ratio_unhedged', '.2%'),
+            ('夏普比率（套保）', 'sharpe_ratio_hedged', '.4f'),
+            ('夏普比率（未套保）', 'sharpe_ratio_unhedged', '.4f'),
+            ('VaR（95%，套保）', 'var_95_hedged', '.2f'),
+            ('VaR（95%，未套保）', 'var_95_unhedged', '.2f')
+        ))
+    )
+
     def __init__(self):
         """初始化回测引擎"""
         self.backtest_results = None
@@ -44,74 +399,95 @@ class BacktestEngine:
         if aligned_data.empty:
             raise ValueError("数据为空，无法进行回测")
 
-        # 准备数据
-        data = aligned_data.copy()
-
         # 计算期货数量
         future_quantity = spot_quantity * hedge_ratio
 
-        # 计算每日价格变化
-        data['spot_price_change'] = data['spot_price'].diff()
-        data['future_price_change'] = data['future_price'].diff()
-
-        # 计算每日盈亏
-        if hedge_direction == HedgeDirection.SHORT_HEDGE:
-            # 库存管理（现货多头）：卖出期货套保
-            # 现货盈亏 = 现货数量 × 现货价格变化
-            # 期货盈亏 = -期货数量 × 期货价格变化（空头）
-            data['spot_pnl'] = spot_quantity * data['spot_price_change']
-            data['future_pnl'] = -future_quantity * data['future_price_change']
-            data['total_pnl'] = data['spot_pnl'] + data['future_pnl']
-
-        elif hedge_direction == HedgeDirection.LONG_HEDGE:
-            # 采购管理（现货空头）：买入期货套保
-            # 现货盈亏 = -现货数量 × 现货价格变化（空头）
-            # 期货盈亏 = 期货数量 × 期货价格变化（多头）
-            data['spot_pnl'] = -spot_quantity * data['spot_price_change']
-            data['future_pnl'] = future_quantity * data['future_price_change']
-            data['total_pnl'] = data['spot_pnl'] + data['future_pnl']
-
-        # 计算未套保的盈亏（仅现货）
-        if hedge_direction == HedgeDirection.SHORT_HEDGE:
-            data['unhedged_pnl'] = spot_quantity * data['spot_price_change']
-        else:
-            data['unhedged_pnl'] = -spot_quantity * data['spot_price_change']
-
-        # 计算累计盈亏
-        data['total_pnl_cumulative'] = data['total_pnl'].cumsum()
-        data['unhedged_pnl_cumulative'] = data['unhedged_pnl'].cumsum()
-        data['spot_pnl_cumulative'] = data['spot_pnl'].cumsum()
-        data['future_pnl_cumulative'] = data['future_pnl'].cumsum()
+        # 取出连续的价格数组，在NumPy中一次性完成差分、盈亏与累计计算
+        spot_prices = aligned_data['spot_price'].to_numpy(dtype=np.float64)
+        future_prices = aligned_data['future_price'].to_numpy(dtype=np.float64)
+
+        # 计算每日价格变化（首行无前值，记为NaN）
+        spot_change = np.empty_like(spot_prices)
+        future_change = np.empty_like(future_prices)
+        spot_change[:1] = np.nan
+        future_change[:1] = np.nan
+        np.subtract(spot_prices[1:], spot_prices[:-1], out=spot_change[1:])
+        np.subtract(future_prices[1:], future_prices[:-1], out=future_change[1:])
+
+        # 计算每日盈亏（按套保方向查表取符号，统一计算）
+        # 库存管理（现货多头）：现货盈亏 = 现货数量 × 现货价格变化，期货盈亏 = -期货数量 × 期货价格变化（空头）
+        # 采购管理（现货空头）：现货盈亏 = -现货数量 × 现货价格变化（空头），期货盈亏 = 期货数量 × 期货价格变化（多头）
+        spot_sign, future_sign = self._PNL_SIGNS[hedge_direction]
+        spot_pnl = (spot_sign * spot_quantity) * spot_change
+        future_pnl = (future_sign * future_quantity) * future_change
+        total_pnl = spot_pnl + future_pnl
+
+        # 未套保的盈亏（仅现货）与现货盈亏完全相同，直接复用，不再重复计算
+        unhedged_pnl = spot_pnl
+        spot_pnl_cumulative = self._cumulative_pnl(spot_pnl)
+
+        # 一次性写回所有列（assign返回新DataFrame，不修改输入数据；累计盈亏跳过首行NaN）
+        data = aligned_data.assign(
+            spot_price_change=spot_change,
+            future_price_change=future_change,
+            spot_pnl=spot_pnl,
+            future_pnl=future_pnl,
+            total_pnl=total_pnl,
+            unhedged_pnl=unhedged_pnl,
+            total_pnl_cumulative=self._cumulative_pnl(total_pnl),
+            unhedged_pnl_cumulative=spot_pnl_cumulative,
+            spot_pnl_cumulative=spot_pnl_cumulative,
+            future_pnl_cumulative=self._cumulative_pnl(future_pnl)
+        )
 
-        # 删除第一行（NaN）
-        data = data.dropna()
+        # 删除第一行（NaN）：仅首行因差分为NaN，直接切片，无需逐列扫描
+        data = data.iloc[1:]
 
         # 计算绩效指标
+        # 期货均价直接由已取出的连续价格数组计算（与切片后的回测数据行一致）
         performance_metrics = self._calculate_performance_metrics(
-            data, hedge_direction, spot_quantity, future_quantity
+            data, hedge_direction, spot_quantity, future_quantity,
+            future_price_mean=future_prices[1:].mean()
         )
 
         # 构建结果
         result = {
             'data': data,
             'performance_metrics': performance_metrics,
-            'hedge_parameters': {
-                'hedge_ratio': hedge_ratio,
-                'spot_quantity': spot_quantity,
-                'future_quantity': future_quantity,
-                'hedge_direction': hedge_direction.value,
-                'future_contract_size': future_contract_size
-            }
+            'hedge_parameters': HedgeParameters(
+                hedge_ratio=hedge_ratio,
+                spot_quantity=spot_quantity,
+                future_quantity=future_quantity,
+                hedge_direction=hedge_direction.value,
+                future_contract_size=future_contract_size
+            )
         }
 
         self.backtest_results = result
         return result
 
+    @staticmethod
+    def _cumulative_pnl(daily_pnl: np.ndarray) -> np.ndarray:
+        """
+        计算累计盈亏（首行为NaN，从第二行开始累加）
+
+        Args:
+            daily_pnl: 每日盈亏数组
+
+        Returns:
+            累计盈亏数组
+        """
+        cumulative = np.empty_like(daily_pnl)
+        cumulative[:1] = np.nan
+        np.cumsum(daily_pnl[1:], out=cumulative[1:])
+        return cumulative
+
     def _calculate_performance_metrics(self,
                                      data: pd.DataFrame,
                                      hedge_direction: HedgeDirection,
                                      spot_quantity: float,
-                                     future_quantity: float) -> Dict:
+                                     future_quantity: float,
+                                     future_price_mean: Optional[float] = None) -> PerformanceMetrics:
         """
         计算绩效指标
 
@@ -120,76 +496,127 @@ class BacktestEngine:
             hedge_direction: 套保方向
             spot_quantity: 现货数量
             future_quantity: 期货数量
+            future_price_mean: 回测期间期货均价，None表示由data重新计算
 
         Returns:
-            绩效指标字典
+            绩效指标
         """
-        metrics = {}
-
         # 基础统计
-        metrics['total_days'] = len(data)
+        total_days = len(data)
+
+        # 热点列只取一次连续数组，融合内核单次遍历得到总盈亏、波动率、最大回撤与盈利天数
+        hedged_pnl = data['total_pnl'].to_numpy(dtype=np.float64)
+        unhedged_pnl = data['unhedged_pnl'].to_numpy(dtype=np.float64)
+        (total_hedged_pnl, hedged_volatility,
+         max_drawdown_hedged, profitable_days_hedged) = _risk_metrics_kernel(hedged_pnl)
+        (total_unhedged_pnl, unhedged_volatility,
+         max_drawdown_unhedged, profitable_days_unhedged) = _risk_metrics_kernel(unhedged_pnl)
+        # 内核返回Python标量，波动率转为NumPy标量，保持零波动率时除法得到inf/nan而非抛出异常
+        hedged_volatility = np.float64(hedged_volatility)
+        unhedged_volatility = np.float64(unhedged_volatility)
 
         # 总盈亏
-        metrics['total_hedged_pnl'] = data['total_pnl'].sum()
-        metrics['total_unhedged_pnl'] = data['unhedged_pnl'].sum()
-        metrics['total_spot_pnl'] = data['spot_pnl'].sum()
-        metrics['total_future_pnl'] = data['future_pnl'].sum()
+        total_spot_pnl = data['spot_pnl'].sum()
+        total_future_pnl = data['future_pnl'].sum()
 
         # 平均每日盈亏
-        metrics['avg_daily_hedged_pnl'] = data['total_pnl'].mean()
-        metrics['avg_daily_unhedged_pnl'] = data['unhedged_pnl'].mean()
-
-        # 盈利天数统计
-        metrics['profitable_days_hedged'] = (data['total_pnl'] > 0).sum()
-        metrics['profitable_days_unhedged'] = (data['unhedged_pnl'] > 0).sum()
-        metrics['profitable_days_ratio_hedged'] = metrics['profitable_days_hedged'] / metrics['total_days']
-        metrics['profitable_days_ratio_unhedged'] = metrics['profitable_days_unhedged'] / metrics['total_days']
+        avg_daily_hedged_pnl = total_hedged_pnl / total_days if total_days else np.nan
+        avg_daily_unhedged_pnl = total_unhedged_pnl / total_days if total_days else np.nan
 
-        # 风险指标
-        metrics['hedged_volatility'] = data['total_pnl'].std()
-        metrics['unhedged_volatility'] = data['unhedged_pnl'].std()
-
-        # 最大回撤
-        metrics['max_drawdown_hedged'] = self._calculate_max_drawdown(data['total_pnl_cumulative'])
-        metrics['max_drawdown_unhedged'] = self._calculate_max_drawdown(data['unhedged_pnl_cumulative'])
+        # 盈利天数占比
+        profitable_days_ratio_hedged = profitable_days_hedged / total_days
+        profitable_days_ratio_unhedged = profitable_days_unhedged / total_days
 
         # 夏普比率（假设无风险利率为0）
-        if metrics['hedged_volatility'] > 0:
-            metrics['sharpe_ratio_hedged'] = metrics['avg_daily_hedged_pnl'] / metrics['hedged_volatility']
+        if hedged_volatility > 0:
+            sharpe_ratio_hedged = avg_daily_hedged_pnl / hedged_volatility
         else:
-            metrics['sharpe_ratio_hedged'] = 0
+            sharpe_ratio_hedged = 0
 
-        if metrics['unhedged_volatility'] > 0:
-            metrics['sharpe_ratio_unhedged'] = metrics['avg_daily_unhedged_pnl'] / metrics['unhedged_volatility']
+        if unhedged_volatility > 0:
+            sharpe_ratio_unhedged = avg_daily_unhedged_pnl / unhedged_volatility
         else:
-            metrics['sharpe_ratio_unhedged'] = 0
-
-        # 风险降低指标
-        variance_reduction = (data['unhedged_pnl'].var() - data['total_pnl'].var()) / data['unhedged_pnl'].var()
-        volatility_reduction = (metrics['unhedged_volatility'] - metrics['hedged_volatility']) / metrics['unhedged_volatility']
+            sharpe_ratio_unhedged = 0
 
-        metrics['variance_reduction_rate'] = variance_reduction
-        metrics['volatility_reduction_rate'] = volatility_reduction
-        metrics['hedging_effectiveness'] = variance_reduction  # 套保有效性
+        # 风险降低指标（方差直接由波动率平方得到，不再重复扫描）
+        hedged_variance = hedged_volatility ** 2
+        unhedged_variance = unhedged_volatility ** 2
+        variance_reduction_rate = (unhedged_variance - hedged_variance) / unhedged_variance
+        volatility_reduction_rate = (unhedged_volatility - hedged_volatility) / unhedged_volatility
+        hedging_effectiveness = variance_reduction_rate  # 套保有效性
 
         # 套保成本（期货交易成本估算）
-        metrics['estimated_hedge_cost'] = abs(future_quantity) * data['future_price'].mean() * 0.001  # 假设0.1%的交易成本
+        if future_price_mean is None:
+            future_price_mean = data['future_price'].mean()
+        estimated_hedge_cost = abs(future_quantity) * future_price_mean * 0.001  # 假设0.1%的交易成本
 
         # 最大单日盈亏
-        metrics['max_daily_gain_hedged'] = data['total_pnl'].max()
-        metrics['max_daily_loss_hedged'] = data['total_pnl'].min()
-        metrics['max_daily_gain_unhedged'] = data['unhedged_pnl'].max()
-        metrics['max_daily_loss_unhedged'] = data['unhedged_pnl'].min()
+        max_daily_gain_hedged = data['total_pnl'].max()
+        max_daily_loss_hedged = data['total_pnl'].min()
+        max_daily_gain_unhedged = data['unhedged_pnl'].max()
+        max_daily_loss_unhedged = data['unhedged_pnl'].min()
 
         # VaR（95%置信水平）
-        metrics['var_95_hedged'] = np.percentile(data['total_pnl'], 5)
-        metrics['var_95_unhedged'] = np.percentile(data['unhedged_pnl'], 5)
+        var_95_hedged = self._calculate_var(hedged_pnl)
+        var_95_unhedged = self._calculate_var(unhedged_pnl)
 
         # 时间范围
-        metrics['start_date'] = data['date'].min().strftime('%Y-%m-%d')
-        metrics['end_date'] = data['date'].max().strftime('%Y-%m-%d')
+        start_date = data['date'].min().strftime('%Y-%m-%d')
+        end_date = data['date'].max().strftime('%Y-%m-%d')
+
+        return PerformanceMetrics(
+            total_days=total_days,
+            total_hedged_pnl=total_hedged_pnl,
+            total_unhedged_pnl=total_unhedged_pnl,
+            total_spot_pnl=total_spot_pnl,
+            total_future_pnl=total_future_pnl,
+            avg_daily_hedged_pnl=avg_daily_hedged_pnl,
+            avg_daily_unhedged_pnl=avg_daily_unhedged_pnl,
+            profitable_days_hedged=profitable_days_hedged,
+            profitable_days_unhedged=profitable_days_unhedged,
+            profitable_days_ratio_hedged=profitable_days_ratio_hedged,
+            profitable_days_ratio_unhedged=profitable_days_ratio_unhedged,
+            hedged_volatility=hedged_volatility,
+            unhedged_volatility=unhedged_volatility,
+            max_drawdown_hedged=max_drawdown_hedged,
+            max_drawdown_unhedged=max_drawdown_unhedged,
+            sharpe_ratio_hedged=sharpe_ratio_hedged,
+            sharpe_ratio_unhedged=sharpe_ratio_unhedged,
+            variance_reduction_rate=variance_reduction_rate,
+            volatility_reduction_rate=volatility_reduction_rate,
+            hedging_effectiveness=hedging_effectiveness,
+            estimated_hedge_cost=estimated_hedge_cost,
+            max_daily_gain_hedged=max_daily_gain_hedged,
+            max_daily_loss_hedged=max_daily_loss_hedged,
+            max_daily_gain_unhedged=max_daily_gain_unhedged,
+            max_daily_loss_unhedged=max_daily_loss_unhedged,
+            var_95_hedged=var_95_hedged,
+            var_95_unhedged=var_95_unhedged,
+            start_date=start_date,
+            end_date=end_date
+        )
+
+    @staticmethod
+    def _calculate_var(daily_pnl: np.ndarray, percentile: float = 5.0) -> float:
+        """
+        计算VaR（与 np.percentile 线性插值结果一致，仅用 np.partition 选出相邻两个次序统计量）
 
-        return metrics
+        Args:
+            daily_pnl: 每日盈亏数组
+            percentile: 百分位数（默认5，即95%置信水平）
+
+        Returns:
+            VaR值
+        """
+        n = daily_pnl.size
+        if n == 0:
+            return np.nan
+        position = (n - 1) * percentile / 100.0
+        lower = int(np.floor(position))
+        upper = min(lower + 1, n - 1)
+        partitioned = np.partition(daily_pnl, (lower, upper))
+        fraction = position - lower
+        return partitioned[lower] + (partitioned[upper] - partitioned[lower]) * fraction
 
     def _calculate_max_drawdown(self, cumulative_series: pd.Series) -> float:
         """
@@ -201,10 +628,10 @@ class BacktestEngine:
         Returns:
             最大回撤值
         """
-        peak = cumulative_series.expanding().max()
-        drawdown = cumulative_series - peak
-        max_drawdown = drawdown.min()
-        return max_drawdown
+        values = cumulative_series.to_numpy(dtype=np.float64)
+        if values.size == 0:
+            return np.nan
+        return _max_drawdown_kernel(values)
 
     def get_period_analysis(self,
                           start_date: str,
@@ -223,7 +650,7 @@ class BacktestEngine:
             raise ValueError("请先运行回测")
 
         data = self.backtest_results['data']
-        hedge_direction = self.backtest_results['hedge_parameters']['hedge_direction']
+        hedge_direction = self.backtest_results['hedge_parameters'].hedge_direction
 
         # 筛选时间段
         period_data = data[(data['date'] >= start_date) & (data['date'] <= end_date)]
@@ -268,14 +695,34 @@ class BacktestEngine:
 
         data = self.backtest_results['data']
 
-        # 计算滚动指标
+        # 流式内核一次遍历得到滚动均值与标准差，波动率与夏普比率共用
+        tasks = [
+            (_rolling_mean_std_kernel, data['total_pnl'].to_numpy(dtype=np.float64)),
+            (_rolling_mean_std_kernel, data['unhedged_pnl'].to_numpy(dtype=np.float64)),
+            (_rolling_corr_kernel,
+             data['spot_price_change'].to_numpy(dtype=np.float64),
+             data['future_price_change'].to_numpy(dtype=np.float64))
+        ]
+        if njit is not None and len(data) >= _PARALLEL_ROLLING_MIN_ROWS:
+            # 三个内核相互独立，大数据量时并行执行
+            with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                futures = [executor.submit(kernel, *arrays, window_size) for kernel, *arrays in tasks]
+                outputs = [future.result() for future in futures]
+        else:
+            outputs = [kernel(*arrays, window_size) for kernel, *arrays in tasks]
+        (hedged_mean, hedged_std), (unhedged_mean, unhedged_std), rolling_corr = outputs
+
+        # 计算滚动指标（零波动率窗口的夏普比率为NaN/inf，与pandas一致且不发出警告）
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rolling_sharpe_hedged = hedged_mean / hedged_std
+            rolling_sharpe_unhedged = unhedged_mean / unhedged_std
         rolling_metrics = pd.DataFrame({
             'date': data['date'],
-            'rolling_volatility_hedged': data['total_pnl'].rolling(window=window_size).std(),
-            'rolling_volatility_unhedged': data['unhedged_pnl'].rolling(window=window_size).std(),
-            'rolling_sharpe_hedged': data['total_pnl'].rolling(window=window_size).mean() / data['total_pnl'].rolling(window=window_size).std(),
-            'rolling_sharpe_unhedged': data['unhedged_pnl'].rolling(window=window_size).mean() / data['unhedged_pnl'].rolling(window=window_size).std(),
-            'rolling_corr': data['spot_price_change'].rolling(window=window_size).corr(data['future_price_change'])
+            'rolling_volatility_hedged': hedged_std,
+            'rolling_volatility_unhedged': unhedged_std,
+            'rolling_sharpe_hedged': rolling_sharpe_hedged,
+            'rolling_sharpe_unhedged': rolling_sharpe_unhedged,
+            'rolling_corr': rolling_corr
         })
 
         return rolling_metrics
@@ -295,36 +742,19 @@ class BacktestEngine:
 
         summary = {
             '套保策略摘要': {
-                '套保方向': '库存管理（卖出套保）' if params['hedge_direction'] == HedgeDirection.SHORT_HEDGE.value else '采购管理（买入套保）',
-                '套保比例': f"{params['hedge_ratio']:.4f}",
-                '现货数量': params['spot_quantity'],
-                '期货数量': f"{params['future_quantity']:.4f}",
-                '回测期间': f"{metrics['start_date']} 至 {metrics['end_date']}",
-                '交易天数': metrics['total_days']
-            },
-            '盈亏表现': {
-                '套保总盈亏': f"{metrics['total_hedged_pnl']:.2f}",
-                '未套保总盈亏': f"{metrics['total_unhedged_pnl']:.2f}",
-                '套保优势': f"{metrics['total_hedged_pnl'] - metrics['total_unhedged_pnl']:.2f}",
-                '平均每日盈亏（套保）': f"{metrics['avg_daily_hedged_pnl']:.2f}",
-                '平均每日盈亏（未套保）': f"{metrics['avg_daily_unhedged_pnl']:.2f}"
-            },
-            '风险控制': {
-                '套保波动率': f"{metrics['hedged_volatility']:.2f}",
-                '未套保波动率': f"{metrics['unhedged_volatility']:.2f}",
-                '波动率降低': f"{metrics['volatility_reduction_rate']:.2%}",
-                '最大回撤（套保）': f"{metrics['max_drawdown_hedged']:.2f}",
-                '最大回撤（未套保）': f"{metrics['max_drawdown_unhedged']:.2f}",
-                '套保有效性': f"{metrics['hedging_effectiveness']:.2%}"
-            },
-            '其他指标': {
-                '盈利天数占比（套保）': f"{metrics['profitable_days_ratio_hedged']:.2%}",
-                '盈利天数占比（未套保）': f"{metrics['profitable_days_ratio_unhedged']:.2%}",
-                '夏普比率（套保）': f"{metrics['sharpe_ratio_hedged']:.4f}",
-                '夏普比率（未套保）': f"{metrics['sharpe_ratio_unhedged']:.4f}",
-                'VaR（95%，套保）': f"{metrics['var_95_hedged']:.2f}",
-                'VaR（95%，未套保）': f"{metrics['var_95_unhedged']:.2f}"
+                '套保方向': '库存管理（卖出套保）' if params.hedge_direction == HedgeDirection.SHORT_HEDGE.value else '采购管理（买入套保）',
+                '套保比例': f"{params.hedge_ratio:.4f}",
+                '现货数量': params.spot_quantity,
+                '期货数量': f"{params.future_quantity:.4f}",
+                '回测期间': f"{metrics.start_date} 至 {metrics.end_date}",
+                '交易天数': metrics.total_days
             }
         }
 
+        # 绩效指标按格式表统一格式化
+        for category, rows in self._SUMMARY_FORMATS:
+            summary[category] = {
+                label: format(getattr(metrics, field), spec) for label, field, spec in rows
+            }
+
         return summary
\ No newline at end of file
@@ -5,18 +5,23 @@
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import akshare as ak
 import os
+import re
 from datetime import datetime, timedelta
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, Union, BinaryIO
 import warnings
 
-warnings.filterwarnings('ignore')
-
 
 class DataProcessor:
     """数据处理类"""
 
+    # 期货数据列名识别规则（日期列不区分大小写）
+    DATE_COLUMN_RE = re.compile(r'date|日期|time', re.IGNORECASE)
+    PRICE_COLUMN_RE = re.compile(r'close|settlement|收盘|结算')
+
     def __init__(self, cache_dir: str = "cache"):
         """
         初始化数据处理器
@@ -25,6 +30,8 @@ class DataProcessor:
             cache_dir: 缓存目录
         """
         self.cache_dir = cache_dir
+        # 各期货合约已识别的 (日期列, 价格列)，避免重复扫描列名
+        self._future_columns: Dict[str, Tuple[str, str]] = {}
         self._ensure_cache_dir()
 
     def _ensure_cache_dir(self):
@@ -50,13 +57,28 @@ class DataProcessor:
         if not all(col in df.columns for col in required_columns):
             return False, f"数据必须包含列: {required_columns}"
 
-        # 检查数据类型
+        # 检查数据类型（按类型读取的列已是目标类型，跳过转换）
         try:
-            df['date'] = pd.to_datetime(df['date'])
-            df['spot_price'] = pd.to_numeric(df['spot_price'])
+            if not pd.api.types.is_datetime64_any_dtype(df['date']):
+                df['date'] = pd.to_datetime(df['date'])
+            # pyarrow引擎将带时间的日期解析为datetime64[s]，统一为纳秒精度，下游只面对一种日期类型
+            if isinstance(df['date'].dtype, np.dtype) and df['date'].dtype != np.dtype('datetime64[ns]'):
+                df['date'] = df['date'].astype('datetime64[ns]')
+            if not pd.api.types.is_numeric_dtype(df['spot_price']):
+                df['spot_price'] = pd.to_numeric(df['spot_price'])
         except Exception as e:
             return False, f"数据格式错误: {str(e)}"
 
+        # 一次性检查价格为负、价格缺失和日期缺失，全部通过时直接返回
+        spot_prices = pa.array(df['spot_price'])
+        has_invalid = pc.any(pc.or_kleene(
+            pc.or_kleene(pc.is_null(spot_prices), pc.less(spot_prices, 0)),
+            pc.is_null(pa.array(df['date']))
+        )).as_py()
+        if not has_invalid:
+            return True, ""
+
+        # 存在无效数据时再逐项检查，给出具体错误信息
         # 检查价格有效性
         if (df['spot_price'] < 0).any():
             return False, "现货价格不能为负数"
@@ -84,8 +106,53 @@ class DataProcessor:
         """
         try:
             # 读取CSV文件
-            df = pd.read_csv(file_path)
+            df = self.read_spot_csv(file_path)
+        except Exception as e:
+            return None, f"文件读取失败: {str(e)}"
+
+        return self.process_spot_data(df, handle_missing)
+
+    @staticmethod
+    def read_spot_csv(source: Union[str, BinaryIO]) -> pd.DataFrame:
+        """
+        使用pyarrow引擎按类型读取现货CSV（日期解析为datetime64，价格为float64）
+
+        Args:
+            source: CSV文件路径或二进制文件对象
 
+        Returns:
+            原始现货数据DataFrame
+        """
+        try:
+            df = pd.read_csv(source, engine='pyarrow',
+                             parse_dates=['date'], dtype={'spot_price': 'float64'})
+        except (KeyError, ValueError):
+            # 缺列或类型不符时按推断类型重新读取，交由 validate_spot_data 给出具体错误
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            return pd.read_csv(source, engine='pyarrow')
+
+        if not pd.api.types.is_datetime64_any_dtype(df['date']):
+            # 日期存在空值等情况时pyarrow不报错而是返回字符串列（空值为'None'），
+            # 改用默认引擎重新读取，空值为NaN，由 validate_spot_data 报告缺失值
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            return pd.read_csv(source)
+        return df
+
+    def process_spot_data(self, df: pd.DataFrame,
+                          handle_missing: str = "drop") -> Tuple[Optional[pd.DataFrame], str]:
+        """
+        处理已读取的现货数据（验证、缺失值处理、排序）
+
+        Args:
+            df: 原始现货数据DataFrame
+            handle_missing: 缺失值处理方式 ("drop" 或 "interpolate")
+
+        Returns:
+            (处理后的DataFrame, 错误信息)
+        """
+        try:
             # 验证数据格式
             is_valid, error_msg = self.validate_spot_data(df)
             if not is_valid:
@@ -96,7 +163,7 @@ class DataProcessor:
                 if handle_missing == "drop":
                     df = df.dropna(subset=['spot_price'])
                 elif handle_missing == "interpolate":
-                    df['spot_price'] = df['spot_price'].interpolate()
+                    df['spot_price'] = self._interpolate_prices(df['spot_price'].to_numpy(dtype=np.float64))
                     df = df.dropna(subset=['spot_price'])
 
             # 按日期排序
@@ -105,110 +172,193 @@ class DataProcessor:
             return df, ""
 
         except Exception as e:
-            return None, f"文件读取失败: {str(e)}"
+            return None, f"数据处理失败: {str(e)}"
+
+    @staticmethod
+    def _interpolate_prices(prices: np.ndarray) -> np.ndarray:
+        """
+        按行位置线性插值填补缺失价格（与 pandas interpolate() 默认行为一致：
+        开头的缺失值保持NaN，末尾的缺失值沿用最后一个有效值）
+
+        Args:
+            prices: 含NaN的价格数组
+
+        Returns:
+            插值后的价格数组
+        """
+        valid_positions = np.flatnonzero(~np.isnan(prices))
+        if valid_positions.size == 0:
+            return prices
+
+        filled = np.interp(np.arange(prices.size), valid_positions, prices[valid_positions])
+        filled[:valid_positions[0]] = np.nan
+        return filled
 
     def get_future_data(self, future_code: str,
-                       start_date: str,
-                       end_date: str) -> Tuple[Optional[pd.DataFrame], str]:
+                       start_date: Union[str, pd.Timestamp],
+                       end_date: Union[str, pd.Timestamp]) -> Tuple[Optional[pd.DataFrame], str]:
         """
         获取期货数据
 
         Args:
             future_code: 期货合约代码 (如 "CU0")
-            start_date: 开始日期 (YYYY-MM-DD)
-            end_date: 结束日期 (YYYY-MM-DD)
+            start_date: 开始日期 (pd.Timestamp 或 YYYY-MM-DD)
+            end_date: 结束日期 (pd.Timestamp 或 YYYY-MM-DD)
 
         Returns:
             (期货数据DataFrame, 错误信息)
         """
         try:
-            # 检查缓存
-            cache_file = os.path.join(self.cache_dir, f"future_{future_code}_{start_date}_{end_date}.csv")
+            # 日线数据按自然日比较：现货日期带时间时归一到当日零点，避免漏掉首个交易日
+            start_dt = pd.Timestamp(start_date).normalize()
+            end_dt = pd.Timestamp(end_date).normalize()
+
+            # 检查缓存（仅在缓存文件名处格式化日期）
+            cache_file = os.path.join(
+                self.cache_dir,
+                f"future_{future_code}_{start_dt.strftime('%Y-%m-%d')}_{end_dt.strftime('%Y-%m-%d')}.parquet"
+            )
 
             if os.path.exists(cache_file):
-                cached_data = pd.read_csv(cache_file)
-                cached_data['date'] = pd.to_datetime(cached_data['date'])
+                # Parquet保留列类型，无需再解析日期
+                cached_data = pd.read_parquet(cache_file)
                 return cached_data, "从缓存读取"
 
             # 获取期货数据
-            # 使用akshare获取期货历史数据
-            try:
-                # 尝试获取主力合约数据
-                future_data = ak.futures_main_sina(symbol=future_code)
-            except:
-                # 如果失败，尝试其他接口
-                future_data = ak.futures_zh_daily_sina(symbol=future_code)
+            # 使用akshare获取期货历史数据（仅在接口调用期间屏蔽其内部产生的警告）
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                try:
+                    # 尝试获取主力合约数据
+                    future_data = ak.futures_main_sina(symbol=future_code)
+                except:
+                    # 如果失败，尝试其他接口
+                    future_data = ak.futures_zh_daily_sina(symbol=future_code)
 
             if future_data.empty:
                 return None, f"未找到期货合约 {future_code} 的数据"
 
-            # 处理数据列名
-            column_mapping = {
-                'date': 'date',
-                'close': 'future_price',
-                'settlement': 'future_price',
-                '收盘价': 'future_price',
-                '结算价': 'future_price'
-            }
-
             # 找到合适的列名
-            price_col = None
-            date_col = None
-
-            for col in future_data.columns:
-                if any(key in col.lower() for key in ['date', '日期', 'time']):
-                    date_col = col
-                elif any(key in col for key in ['close', 'settlement', '收盘', '结算']):
-                    price_col = col
-
-            if date_col is None or price_col is None:
+            columns = self._resolve_future_columns(future_code, future_data.columns)
+            if columns is None:
                 return None, "期货数据格式不正确，无法识别日期和价格列"
-
-            # 提取需要的列
+            date_col, price_col = columns
+
+            # 只取需要的两列并转为NumPy数组
+            dates = pd.to_datetime(future_data[date_col].to_numpy(), cache=True).to_numpy()
+            prices = pd.to_numeric(future_data[price_col]).to_numpy(dtype=np.float64)
+
+            # 剔除缺失价格，保证对齐数据中只有差分首行为NaN
+            valid = ~np.isnan(prices)
+            if not valid.all():
+                dates = dates[valid]
+                prices = prices[valid]
+
+            # 按日期排序（akshare通常已按日期升序返回）
+            if not (dates[1:] >= dates[:-1]).all():
+                order = np.argsort(dates, kind='stable')
+                dates = dates[order]
+                prices = prices[order]
+
+            # 二分查找筛选日期范围，切片后再构建DataFrame
+            lo = np.searchsorted(dates, start_dt.to_datetime64(), side='left')
+            hi = np.searchsorted(dates, end_dt.to_datetime64(), side='right')
             result_df = pd.DataFrame({
-                'date': pd.to_datetime(future_data[date_col]),
-                'future_price': pd.to_numeric(future_data[price_col])
+                'date': dates[lo:hi],
+                'future_price': prices[lo:hi]
             })
 
-            # 筛选日期范围
-            start_dt = pd.to_datetime(start_date)
-            end_dt = pd.to_datetime(end_date)
-            result_df = result_df[(result_df['date'] >= start_dt) & (result_df['date'] <= end_dt)]
-
             if result_df.empty:
                 return None, "指定日期范围内无期货数据"
 
-            # 按日期排序
-            result_df = result_df.sort_values('date').reset_index(drop=True)
-
-            # 缓存数据
-            result_df.to_csv(cache_file, index=False)
+            # 缓存数据（Parquet列式存储，读取时免去文本解析）
+            result_df.to_parquet(cache_file, index=False, compression='zstd')
 
             return result_df, ""
 
         except Exception as e:
             return None, f"获取期货数据失败: {str(e)}"
 
+    def _resolve_future_columns(self, future_code: str,
+                                columns: pd.Index) -> Optional[Tuple[str, str]]:
+        """
+        识别期货数据中的日期列和价格列（按合约代码缓存识别结果）
+
+        Args:
+            future_code: 期货合约代码
+            columns: 期货数据的列名
+
+        Returns:
+            (日期列, 价格列)，无法识别时返回None
+        """
+        cached = self._future_columns.get(future_code)
+        if cached is not None and cached[0] in columns and cached[1] in columns:
+            return cached
+
+        price_col = None
+        date_col = None
+
+        # 同类列有多个时取最后一个，因此倒序扫描、首次命中即定，两列都找到后提前结束
+        for col in reversed(columns):
+            if self.DATE_COLUMN_RE.search(col):
+                if date_col is None:
+                    date_col = col
+            elif price_col is None and self.PRICE_COLUMN_RE.search(col):
+                price_col = col
+            if date_col is not None and price_col is not None:
+                break
+
+        if date_col is None or price_col is None:
+            return None
+
+        self._future_columns[future_code] = (date_col, price_col)
+        return date_col, price_col
+
     def align_data(self, spot_df: pd.DataFrame,
-                  future_df: pd.DataFrame) -> pd.DataFrame:
+                  future_df: pd.DataFrame,
+                  tolerance: Optional[Union[str, pd.Timedelta]] = None) -> pd.DataFrame:
         """
         对齐现货和期货数据
 
         Args:
             spot_df: 现货数据
             future_df: 期货数据
+            tolerance: 最近交易日匹配的最大间隔 (如 "3D")，None表示按日期精确匹配
 
         Returns:
             对齐后的DataFrame
         """
-        # 基于日期对齐数据
-        aligned_df = pd.merge(spot_df, future_df, on='date', how='inner')
+        # 两侧日期统一为纳秒精度（merge_asof 要求合并键类型完全一致；pyarrow读取的带时间日期为秒精度）
+        if spot_df['date'].dtype != np.dtype('datetime64[ns]'):
+            spot_df = spot_df.astype({'date': 'datetime64[ns]'})
+        if future_df['date'].dtype != np.dtype('datetime64[ns]'):
+            future_df = future_df.astype({'date': 'datetime64[ns]'})
+
+        # 两侧按日期有序时可直接利用有序性对齐（加载函数已排序，此处仅兜底）
+        if not spot_df['date'].is_monotonic_increasing:
+            spot_df = spot_df.sort_values('date')
+        if not future_df['date'].is_monotonic_increasing:
+            future_df = future_df.sort_values('date')
+
+        if tolerance is None:
+            # 基于日期索引对齐数据
+            aligned_df = spot_df.set_index('date').join(
+                future_df.set_index('date'), how='inner'
+            ).reset_index()
+        else:
+            # 按最近交易日对齐，超出容差的日期视为无匹配
+            aligned_df = pd.merge_asof(
+                spot_df, future_df, on='date',
+                direction='nearest', tolerance=pd.Timedelta(tolerance)
+            ).dropna(subset=['future_price']).reset_index(drop=True)
 
         if aligned_df.empty:
             raise ValueError("现货和期货数据没有重叠的日期")
 
-        # 按日期排序
-        aligned_df = aligned_df.sort_values('date').reset_index(drop=True)
+        # 统一为NumPy原生类型，保证后续计算中 to_numpy() 为零拷贝视图
+        aligned_df = aligned_df.astype(
+            {'date': 'datetime64[ns]', 'spot_price': 'float64', 'future_price': 'float64'}
+        )
 
         return aligned_df
 
@@ -5,7 +5,6 @@
 
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
 from typing import Tuple, Dict, Optional
 from scipy import stats
 
@@ -16,6 +15,8 @@ class HedgeRatioCalculator:
     def __init__(self):
         """初始化套保比例计算器"""
         self.last_calculation = None
+        # 最近一次计算所用数据及其价格变化量，同一份数据重复调用时直接复用
+        self._price_change_cache = None
 
     def calculate_optimal_hedge_ratio(self,
                                     aligned_data: pd.DataFrame,
@@ -33,40 +34,61 @@ class HedgeRatioCalculator:
         if aligned_data.empty:
             raise ValueError("数据为空，无法计算套保比例")
 
-        # 准备数据
-        if window_size and window_size < len(aligned_data):
-            # 使用指定窗口
-            data = aligned_data.tail(window_size).copy()
-        else:
-            # 使用全部数据
-            data = aligned_data.copy()
-
         # 计算价格变化量
-        data['spot_change'] = data['spot_price'].diff()
-        data['future_change'] = data['future_price'].diff()
+        spot_change, future_change = self._get_price_changes(aligned_data)
 
-        # 删除第一行（NaN）
-        data = data.dropna()
+        # 准备数据
+        if window_size and window_size < len(aligned_data):
+            # 使用指定窗口（最后 window_size 行对应最后 window_size-1 个变化量）
+            start = len(aligned_data) - window_size
+            spot_change = spot_change[start:]
+            future_change = future_change[start:]
 
-        if len(data) < 2:
+        if spot_change.size < 2:
             raise ValueError("数据量不足，无法计算套保比例")
 
-        # 方法1: 最小方差法 (直接计算)
-        cov_matrix = np.cov(data['spot_change'], data['future_change'])
-        hedge_ratio_mv = cov_matrix[0, 1] / cov_matrix[1, 1]
-
-        # 方法2: 线性回归法 (OLS)
-        X = sm.add_constant(data['future_change'])  # 添加常数项
-        model = sm.OLS(data['spot_change'], X).fit()
-
-        hedge_ratio_ols = model.params[1]  # 斜率系数
+        # 一次性计算均值与中心化二阶矩，以下三种方法及回归统计量均由此解析推导
+        n = spot_change.size
+        spot_mean = spot_change.mean()
+        future_mean = future_change.mean()
+        spot_dev = spot_change - spot_mean
+        future_dev = future_change - future_mean
+        s_ss = spot_dev @ spot_dev    # 现货离差平方和
+        s_ff = future_dev @ future_dev  # 期货离差平方和
+        s_sf = spot_dev @ future_dev  # 离差交叉积和
+
+        # 方法1: 最小方差法 (cov / var_f)
+        hedge_ratio_mv = s_sf / s_ff
+
+        # 方法2: 线性回归法 (OLS，spot_change = a + b × future_change)
+        hedge_ratio_ols = s_sf / s_ff  # 斜率系数
+        intercept = spot_mean - hedge_ratio_ols * future_mean
+        df_resid = n - 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ssr = np.maximum(s_ss - hedge_ratio_ols * s_sf, 0.0)  # 残差平方和
+            # 仅两个观测时残差自由度为0，残差方差及其推导的标准误、t值、p值均无定义
+            sigma2 = ssr / df_resid if df_resid > 0 else np.nan
+            slope_std_error = np.sqrt(sigma2 / s_ff)
+            intercept_std_error = np.sqrt(sigma2 * (1.0 / n + future_mean ** 2 / s_ff))
+            slope_t = hedge_ratio_ols / slope_std_error
+            intercept_t = intercept / intercept_std_error
+            r_squared = 1 - ssr / s_ss
+            adj_r_squared = 1 - (1 - r_squared) * (n - 1) / df_resid if df_resid > 0 else np.nan
+            f_statistic = slope_t ** 2
+
+        slope_pvalue = 2 * stats.t.sf(abs(slope_t), df_resid)
+        intercept_pvalue = 2 * stats.t.sf(abs(intercept_t), df_resid)
+        f_pvalue = stats.f.sf(f_statistic, 1, df_resid)
 
         # 方法3: 相关系数调整法
-        correlation = np.corrcoef(data['spot_change'], data['future_change'])[0, 1]
-        spot_vol = data['spot_change'].std()
-        future_vol = data['future_change'].std()
+        correlation = s_sf / np.sqrt(s_ss * s_ff)
+        spot_vol = np.sqrt(s_ss / (n - 1))
+        future_vol = np.sqrt(s_ff / (n - 1))
         hedge_ratio_corr = correlation * (spot_vol / future_vol)
 
+        # 相关系数显著性检验（与OLS斜率的t检验等价）
+        correlation_pvalue = slope_pvalue
+
         # 使用最小方差法的结果作为主要推荐值
         optimal_ratio = hedge_ratio_mv
 
@@ -76,30 +98,53 @@ class HedgeRatioCalculator:
             'hedge_ratio_ols': hedge_ratio_ols,
             'hedge_ratio_corr': hedge_ratio_corr,
             'regression_results': {
-                'r_squared': model.rsquared,
-                'adj_r_squared': model.rsquared_adj,
-                'f_statistic': model.fvalue,
-                'f_pvalue': model.f_pvalue,
-                'intercept': model.params[0],
-                'intercept_pvalue': model.pvalues[0],
-                'slope': model.params[1],
-                'slope_pvalue': model.pvalues[1],
-                'slope_std_error': model.bse[1]
+                'r_squared': r_squared,
+                'adj_r_squared': adj_r_squared,
+                'f_statistic': f_statistic,
+                'f_pvalue': f_pvalue,
+                'intercept': intercept,
+                'intercept_pvalue': intercept_pvalue,
+                'slope': hedge_ratio_ols,
+                'slope_pvalue': slope_pvalue,
+                'slope_std_error': slope_std_error
             },
             'correlation_analysis': {
                 'correlation': correlation,
                 'spot_volatility': spot_vol,
                 'future_volatility': future_vol,
-                'correlation_pvalue': stats.pearsonr(data['spot_change'], data['future_change'])[1]
+                'correlation_pvalue': correlation_pvalue
             },
             'calculation_method': 'minimum_variance',
-            'data_points': len(data),
+            'data_points': spot_change.size,
             'window_used': window_size if window_size else 'all_data'
         }
 
         self.last_calculation = result
         return optimal_ratio, result
 
+    def _get_price_changes(self, aligned_data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        获取现货和期货的每日价格变化量（同一份数据只计算一次）
+
+        Args:
+            aligned_data: 对齐后的数据
+
+        Returns:
+            (现货价格变化量, 期货价格变化量)，均为只读数组
+        """
+        cache = self._price_change_cache
+        if cache is not None and cache[0] is aligned_data:
+            return cache[1], cache[2]
+
+        # np.diff 直接去掉首行，无需复制数据
+        spot_change = np.diff(aligned_data['spot_price'].to_numpy(dtype=np.float64))
+        future_change = np.diff(aligned_data['future_price'].to_numpy(dtype=np.float64))
+        spot_change.flags.writeable = False
+        future_change.flags.writeable = False
+
+        self._price_change_cache = (aligned_data, spot_change, future_change)
+        return spot_change, future_change
+
     def calculate_hedge_effectiveness(self,
                                     aligned_data: pd.DataFrame,
                                     hedge_ratio: float) -> Dict:
@@ -116,22 +161,18 @@ class HedgeRatioCalculator:
         if aligned_data.empty:
             raise ValueError("数据为空，无法计算套保有效性")
 
-        data = aligned_data.copy()
-        data['spot_change'] = data['spot_price'].diff()
-        data['future_change'] = data['future_price'].diff()
+        # 计算价格变化量
+        spot_change, future_change = self._get_price_changes(aligned_data)
 
         # 计算套保后的收益变化
-        data['hedged_change'] = data['spot_change'] - hedge_ratio * data['future_change']
-
-        # 删除第一行（NaN）
-        data = data.dropna()
+        hedged_change = spot_change - hedge_ratio * future_change
 
-        if len(data) < 2:
+        if spot_change.size < 2:
             raise ValueError("数据量不足，无法计算套保有效性")
 
-        # 计算方差
-        unhedged_variance = data['spot_change'].var()
-        hedged_variance = data['hedged_change'].var()
+        # 计算方差（样本方差，与pandas一致）
+        unhedged_variance = spot_change.var(ddof=1)
+        hedged_variance = hedged_change.var(ddof=1)
 
         # 套保有效性
         hedge_effectiveness = 1 - (hedged_variance / unhedged_variance)
@@ -205,40 +246,33 @@ class HedgeRatioCalculator:
         if aligned_data.empty:
             raise ValueError("数据为空，无法进行敏感性分析")
 
-        data = aligned_data.copy()
-        data['spot_change'] = data['spot_price'].diff()
-        data['future_change'] = data['future_price'].diff()
-        data = data.dropna()
+        # 计算价格变化量
+        spot_change, future_change = self._get_price_changes(aligned_data)
 
         # 生成套保比例范围
         ratio_min = base_ratio * (1 - ratio_range)
         ratio_max = base_ratio * (1 + ratio_range)
         ratios = np.linspace(ratio_min, ratio_max, steps)
 
-        results = []
-
-        for ratio in ratios:
-            # 计算套保后的收益变化
-            hedged_change = data['spot_change'] - ratio * data['future_change']
-
-            # 计算统计指标
-            variance = hedged_change.var()
-            volatility = np.sqrt(variance)
-            unhedged_variance = data['spot_change'].var()
-
-            effectiveness = 1 - (variance / unhedged_variance)
-            risk_reduction = (unhedged_variance - variance) / unhedged_variance
-
-            results.append({
-                'hedge_ratio': ratio,
-                'variance': variance,
-                'volatility': volatility,
-                'effectiveness': effectiveness,
-                'risk_reduction': risk_reduction,
-                'ratio_deviation_pct': ((ratio - base_ratio) / base_ratio) * 100
-            })
-
-        return pd.DataFrame(results)
+        # 广播计算所有比例下的套保后收益变化，形状为 (steps, N)
+        hedged_changes = spot_change[None, :] - ratios[:, None] * future_change[None, :]
+
+        # 计算统计指标（样本方差，与pandas一致）
+        variance = hedged_changes.var(axis=1, ddof=1)
+        volatility = np.sqrt(variance)
+        unhedged_variance = spot_change.var(ddof=1)
+
+        effectiveness = 1 - (variance / unhedged_variance)
+        risk_reduction = (unhedged_variance - variance) / unhedged_variance
+
+        return pd.DataFrame({
+            'hedge_ratio': ratios,
+            'variance': variance,
+            'volatility': volatility,
+            'effectiveness': effectiveness,
+            'risk_reduction': risk_reduction,
+            'ratio_deviation_pct': ((ratios - base_ratio) / base_ratio) * 100
+        })
 
     def validate_hedge_ratio(self, ratio: float) -> Tuple[bool, str]:
         """
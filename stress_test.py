@@ -5,11 +5,69 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union, BinaryIO
 from datetime import datetime, timedelta
-import warnings
-
-warnings.filterwarnings('ignore')
+import io
+
+from backtest_engine import BacktestEngine, _max_drawdown_kernel, aggregate_period_metrics
+
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖，缺失时回退到NumPy实现
+    njit = None
+
+# 压力类型取值固定：识别出的三类行情在前（顺序与分类编码一致），其后为自定义与正常时期
+STRESS_TYPE_LABELS = ('大跌行情', '大涨行情', '高波动行情', '自定义测试', '正常时期')
+STRESS_TYPE_DTYPE = pd.CategoricalDtype(categories=list(STRESS_TYPE_LABELS))
+
+
+def _find_runs_loop(is_extreme: np.ndarray, min_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    单次遍历找出连续为True且长度不少于 min_length 的区间
+
+    Args:
+        is_extreme: 极端变化日标记数组
+        min_length: 最少连续天数
+
+    Returns:
+        (开始位置数组, 结束位置数组)，均为闭区间行位置
+    """
+    n = is_extreme.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    count = 0
+    run_start = -1
+    for i in range(n + 1):
+        flag = i < n and is_extreme[i]
+        if flag:
+            if run_start < 0:
+                run_start = i
+        elif run_start >= 0:
+            if i - run_start >= min_length:
+                starts[count] = run_start
+                ends[count] = i - 1
+                count += 1
+            run_start = -1
+    return starts[:count], ends[:count]
+
+
+def _find_runs_numpy(is_extreme: np.ndarray, min_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """游程编码找出连续区间（未安装numba时使用）"""
+    # 两端补False后差分，+1为开始、-1为结束的下一位置
+    padded = np.concatenate(([False], is_extreme, [False])).astype(np.int8)
+    boundaries = np.diff(padded)
+    starts = np.flatnonzero(boundaries == 1)
+    ends = np.flatnonzero(boundaries == -1) - 1
+
+    # 过滤持续天数不足的时期
+    keep = (ends - starts + 1) >= min_length
+    return starts[keep], ends[keep]
+
+
+if njit is not None:
+    _find_runs_kernel = njit(cache=True)(_find_runs_loop)
+else:
+    _find_runs_kernel = _find_runs_numpy
 
 
 class StressTestAnalyzer:
@@ -18,7 +76,10 @@ class StressTestAnalyzer:
     def __init__(self):
         """初始化压力测试分析器"""
         self.stress_periods = []
+        self.stress_periods_arr = {}
         self.stress_results = {}
+        self._spot_pct_cache = None
+        self._cumulative_pnl_cache = None
 
     def identify_stress_periods(self,
                               aligned_data: pd.DataFrame,
@@ -38,93 +99,135 @@ class StressTestAnalyzer:
         if aligned_data.empty:
             raise ValueError("数据为空，无法识别压力时期")
 
-        data = aligned_data.copy()
+        # 现货价格日变化率（同一份数据只计算一次，调整阈值重新识别时复用；不复制也不修改传入数据）
+        spot_change_pct = self._get_spot_change_pct(aligned_data)
 
-        # 计算现货价格日变化率
-        data['spot_price_change_pct'] = data['spot_price'].pct_change() * 100
+        # 识别极端变化日（首行变化率为NaN，比较结果为False）
+        is_extreme = np.abs(spot_change_pct) > price_change_threshold
 
-        # 识别极端变化日
-        data['is_extreme'] = np.abs(data['spot_price_change_pct']) > price_change_threshold
+        # 找到持续天数满足要求的连续压力时期
+        starts, ends = _find_runs_kernel(is_extreme, min_consecutive_days)
 
-        # 找到连续的压力时期
-        stress_periods = []
-        in_stress_period = False
-        period_start = None
-
-        for idx, row in data.iterrows():
-            if row['is_extreme'] and not in_stress_period:
-                # 开始新的压力时期
-                in_stress_period = True
-                period_start = idx
-            elif not row['is_extreme'] and in_stress_period:
-                # 结束压力时期
-                period_end = idx - 1
-                period_length = period_end - period_start + 1
-
-                if period_length >= min_consecutive_days:
-                    # 记录压力时期
-                    period_data = data.loc[period_start:period_end]
-                    stress_period = self._create_stress_period_summary(
-                        period_data, period_start, period_end
-                    )
-                    stress_periods.append(stress_period)
-
-                in_stress_period = False
-
-        # 处理最后一个未结束的压力时期
-        if in_stress_period and period_start is not None:
-            period_end = len(data) - 1
-            period_length = period_end - period_start + 1
-
-            if period_length >= min_consecutive_days:
-                period_data = data.loc[period_start:period_end]
-                stress_period = self._create_stress_period_summary(
-                    period_data, period_start, period_end
-                )
-                stress_periods.append(stress_period)
+        # 取出各列的NumPy数组，后续按行位置切片
+        dates = aligned_data['date'].to_numpy()
+        spot_prices = aligned_data['spot_price'].to_numpy(dtype=np.float64)
+        future_prices = aligned_data['future_price'].to_numpy(dtype=np.float64)
+
+        # 批量判断压力类型：区间涨跌幅超过 阈值 × 持续天数 × 0.3 视为大跌/大涨，否则为高波动
+        durations = ends - starts + 1
+        period_change_pct = (spot_prices[ends] / spot_prices[starts] - 1) * 100
+        type_threshold = price_change_threshold * durations * 0.3
+        stress_type_codes = np.select(
+            [period_change_pct < -type_threshold, period_change_pct > type_threshold],
+            [0, 1],
+            default=2
+        )
+        # 各时期共享同一组标签字符串对象
+        stress_types = [STRESS_TYPE_LABELS[code] for code in stress_type_codes.tolist()]
+
+        # 数据按日期升序，起止日期直接按位置取出，一次批量格式化为字符串
+        start_dates = dates[starts].astype('datetime64[D]')
+        end_dates = dates[ends].astype('datetime64[D]')
+        start_date_strs = np.datetime_as_string(start_dates, unit='D').tolist()
+        end_date_strs = np.datetime_as_string(end_dates, unit='D').tolist()
 
+        # 记录压力时期（仅遍历满足条件的少数时期）
+        stress_periods = []
+        for period_start, period_end, start_date, end_date, stress_type in zip(
+                starts.tolist(), ends.tolist(), start_date_strs, end_date_strs, stress_types):
+            period = slice(period_start, period_end + 1)
+            stress_period = self._create_stress_period_summary(
+                start_date, end_date, spot_prices[period], future_prices[period],
+                spot_change_pct[period], period_start, period_end
+            )
+            stress_period['stress_type'] = stress_type
+            stress_periods.append(stress_period)
+
+        # 列式存储压力时期的数值字段，供按列聚合和掩码构建使用
+        self.stress_periods_arr = {
+            'start_index': starts.astype(np.int32),
+            'end_index': ends.astype(np.int32),
+            'duration_days': durations.astype(np.int32),
+            'start_date': start_dates,
+            'end_date': end_dates,
+            'spot_price_change_pct': period_change_pct,
+            'future_price_change_pct': (future_prices[ends] / future_prices[starts] - 1) * 100,
+            'volatility_spot': np.fromiter((p['volatility_spot'] for p in stress_periods),
+                                           dtype=np.float64, count=len(stress_periods)),
+            'volatility_future': np.fromiter((p['volatility_future'] for p in stress_periods),
+                                             dtype=np.float64, count=len(stress_periods)),
+            'stress_type': pd.Categorical.from_codes(stress_type_codes, dtype=STRESS_TYPE_DTYPE)
+        }
         self.stress_periods = stress_periods
         return stress_periods
 
+    def _get_spot_change_pct(self, aligned_data: pd.DataFrame) -> np.ndarray:
+        """
+        获取现货价格日变化率（百分比，首行为NaN；同一份数据只计算一次）
+
+        Args:
+            aligned_data: 对齐后的价格数据
+
+        Returns:
+            现货价格日变化率只读数组
+        """
+        cache = self._spot_pct_cache
+        if cache is not None and cache[0] is aligned_data:
+            return cache[1]
+
+        spot_prices = aligned_data['spot_price'].to_numpy(dtype=np.float64)
+        spot_change_pct = np.empty_like(spot_prices)
+        spot_change_pct[:1] = np.nan
+        spot_change_pct[1:] = (spot_prices[1:] / spot_prices[:-1] - 1) * 100
+        spot_change_pct.flags.writeable = False
+
+        self._spot_pct_cache = (aligned_data, spot_change_pct)
+        return spot_change_pct
+
     def _create_stress_period_summary(self,
-                                    period_data: pd.DataFrame,
+                                    start_date: str,
+                                    end_date: str,
+                                    spot_prices: np.ndarray,
+                                    future_prices: np.ndarray,
+                                    spot_change_pct: np.ndarray,
                                     start_idx: int,
                                     end_idx: int) -> Dict:
         """
-        创建压力时期摘要
+        创建压力时期摘要（压力类型由调用方批量判断后写入）
 
         Args:
-            period_data: 压力时期数据
+            start_date: 开始日期（YYYY-MM-DD）
+            end_date: 结束日期（YYYY-MM-DD）
+            spot_prices: 压力时期现货价格数组
+            future_prices: 压力时期期货价格数组
+            spot_change_pct: 压力时期现货日变化率数组（百分比）
             start_idx: 开始索引
             end_idx: 结束索引
 
         Returns:
             压力时期摘要字典
         """
+        spot_first, spot_last = spot_prices[0], spot_prices[-1]
+        future_first, future_last = future_prices[0], future_prices[-1]
+        abs_spot_change_pct = np.abs(spot_change_pct)
+        future_change_pct = future_prices[1:] / future_prices[:-1] - 1
+
         summary = {
-            'start_date': period_data['date'].min().strftime('%Y-%m-%d'),
-            'end_date': period_data['date'].max().strftime('%Y-%m-%d'),
-            'duration_days': len(period_data),
+            'start_date': start_date,
+            'end_date': end_date,
+            'duration_days': len(spot_prices),
             'start_index': start_idx,
             'end_index': end_idx,
-            'spot_price_change': period_data['spot_price'].iloc[-1] - period_data['spot_price'].iloc[0],
-            'spot_price_change_pct': (period_data['spot_price'].iloc[-1] / period_data['spot_price'].iloc[0] - 1) * 100,
-            'future_price_change': period_data['future_price'].iloc[-1] - period_data['future_price'].iloc[0],
-            'future_price_change_pct': (period_data['future_price'].iloc[-1] / period_data['future_price'].iloc[0] - 1) * 100,
-            'max_daily_spot_change': period_data['spot_price_change_pct'].abs().max(),
-            'avg_daily_spot_change': period_data['spot_price_change_pct'].abs().mean(),
-            'volatility_spot': period_data['spot_price_change_pct'].std(),
-            'volatility_future': period_data['future_price'].pct_change().std() * 100
+            'spot_price_change': spot_last - spot_first,
+            'spot_price_change_pct': (spot_last / spot_first - 1) * 100,
+            'future_price_change': future_last - future_first,
+            'future_price_change_pct': (future_last / future_first - 1) * 100,
+            'max_daily_spot_change': abs_spot_change_pct.max(),
+            'avg_daily_spot_change': abs_spot_change_pct.mean(),
+            'volatility_spot': spot_change_pct.std(ddof=1) if spot_change_pct.size > 1 else np.nan,
+            'volatility_future': future_change_pct.std(ddof=1) * 100 if future_change_pct.size > 1 else np.nan
         }
 
-        # 判断压力类型
-        if summary['spot_price_change_pct'] < -price_change_threshold * summary['duration_days'] * 0.3:
-            summary['stress_type'] = '大跌行情'
-        elif summary['spot_price_change_pct'] > price_change_threshold * summary['duration_days'] * 0.3:
-            summary['stress_type'] = '大涨行情'
-        else:
-            summary['stress_type'] = '高波动行情'
-
         return summary
 
     def run_stress_test(self,
@@ -146,19 +249,18 @@ class StressTestAnalyzer:
             raise ValueError("回测结果无效")
 
         data = backtest_results['data']
-        hedge_params = backtest_results['hedge_parameters']
 
         if custom_period:
             # 自定义时期压力测试
-            stress_results = self._test_custom_period(data, custom_period, hedge_params)
+            stress_results = self._test_custom_period(data, custom_period)
         elif stress_periods:
             # 指定压力时期测试
-            stress_results = self._test_specific_periods(data, stress_periods, hedge_params)
+            stress_results = self._test_specific_periods(data, stress_periods)
         else:
             # 使用之前识别的压力时期
             if not self.stress_periods:
                 self.identify_stress_periods(data)
-            stress_results = self._test_specific_periods(data, self.stress_periods, hedge_params)
+            stress_results = self._test_specific_periods(data, self.stress_periods)
 
         # 添加正常时期对比
         normal_results = self._get_normal_period_analysis(data)
@@ -175,26 +277,32 @@ class StressTestAnalyzer:
 
     def _test_custom_period(self,
                           data: pd.DataFrame,
-                          custom_period: Tuple[str, str],
-                          hedge_params: Dict) -> Dict:
+                          custom_period: Tuple[str, str]) -> Dict:
         """
         测试自定义时期
 
         Args:
             data: 回测数据
             custom_period: 自定义时期 (start_date, end_date)
-            hedge_params: 套保参数
 
         Returns:
             自定义时期测试结果
         """
         start_date, end_date = custom_period
-        period_data = data[(data['date'] >= start_date) & (data['date'] <= end_date)]
+
+        # 回测数据按日期升序，二分查找得到切片边界
+        dates = data['date'].to_numpy()
+        lo = np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side='left')
+        hi = np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side='right')
+        period_data = data.iloc[lo:hi]
 
         if period_data.empty:
             raise ValueError(f"指定时期 {start_date} 至 {end_date} 无数据")
 
-        period_result = self._calculate_period_performance(period_data, hedge_params)
+        hedged_cum, unhedged_cum = self._get_cumulative_pnl(data)
+        period_result = self._calculate_period_performance(
+            period_data, (hedged_cum[lo:hi], unhedged_cum[lo:hi])
+        )
         period_result['period_info'] = {
             'start_date': start_date,
             'end_date': end_date,
@@ -209,48 +317,164 @@ class StressTestAnalyzer:
 
     def _test_specific_periods(self,
                              data: pd.DataFrame,
-                             stress_periods: List[Dict],
-                             hedge_params: Dict) -> Dict:
+                             stress_periods: List[Dict]) -> Dict:
         """
         测试指定压力时期
 
         Args:
             data: 回测数据
             stress_periods: 压力时期列表
-            hedge_params: 套保参数
 
         Returns:
             压力时期测试结果
         """
-        period_results = []
+        # 按行位置截取的时期边界（与 iloc 切片一致，超出数据范围的部分截断）
+        n = len(data)
+        bounds = [(max(period['start_index'], 0), min(period['end_index'], n - 1))
+                  for period in stress_periods]
 
-        for period in stress_periods:
-            start_idx = period['start_index']
-            end_idx = period['end_index']
+        # 压力时期互不重叠时（识别出的时期均如此）一次分组聚合全部时期，否则逐个计算
+        ordered = sorted(b for b in bounds if b[0] <= b[1])
+        non_overlapping = all(prev[1] < cur[0] for prev, cur in zip(ordered, ordered[1:]))
 
-            # 提取时期数据
-            period_data = data.iloc[start_idx:end_idx+1].copy()
+        if non_overlapping:
+            period_results = self._calculate_periods_performance(data, bounds)
+        else:
+            hedged_cum, unhedged_cum = self._get_cumulative_pnl(data)
+            period_results = [
+                self._calculate_period_performance(
+                    data.iloc[start_idx:end_idx + 1],
+                    (hedged_cum[start_idx:end_idx + 1], unhedged_cum[start_idx:end_idx + 1])
+                )
+                for start_idx, end_idx in bounds
+            ]
 
-            # 计算时期绩效
-            period_result = self._calculate_period_performance(period_data, hedge_params)
+        for period_result, period in zip(period_results, stress_periods):
             period_result['period_info'] = period
 
-            period_results.append(period_result)
-
         return {
             'stress_periods': period_results,
             'test_type': 'identified_periods'
         }
 
+    def _calculate_periods_performance(self,
+                                     data: pd.DataFrame,
+                                     bounds: List[Tuple[int, int]]) -> List[Dict]:
+        """
+        分组聚合批量计算多个互不重叠时期的绩效（结果与逐个调用 _calculate_period_performance 一致）
+
+        Args:
+            data: 回测数据
+            bounds: 各时期的 (开始位置, 结束位置)，均为闭区间行位置
+
+        Returns:
+            各时期绩效结果列表（无数据的时期为空字典）
+        """
+        # 每行标记所属时期编号，不属于任何时期的行为-1
+        period_id = np.full(len(data), -1, dtype=np.int64)
+        for i, (start_idx, end_idx) in enumerate(bounds):
+            period_id[start_idx:end_idx + 1] = i
+        mask = period_id >= 0
+        group_ids = period_id[mask]
+
+        hedged_pnl = data['total_pnl'].to_numpy(dtype=np.float64)[mask]
+        unhedged_pnl = data['unhedged_pnl'].to_numpy(dtype=np.float64)[mask]
+        frame = pd.DataFrame({
+            'total_pnl': hedged_pnl,
+            'unhedged_pnl': unhedged_pnl,
+            'spot_pnl': data['spot_pnl'].to_numpy(dtype=np.float64)[mask],
+            'future_pnl': data['future_pnl'].to_numpy(dtype=np.float64)[mask],
+            'hedged_profitable': hedged_pnl > 0,
+            'unhedged_profitable': unhedged_pnl > 0
+        })
+        groups = frame.groupby(group_ids, sort=True)
+
+        # 一次分组聚合得到全部基础统计
+        stats = groups.agg(
+            days=('total_pnl', 'size'),
+            total_hedged_pnl=('total_pnl', 'sum'),
+            total_unhedged_pnl=('unhedged_pnl', 'sum'),
+            total_spot_pnl=('spot_pnl', 'sum'),
+            total_future_pnl=('future_pnl', 'sum'),
+            avg_daily_hedged_pnl=('total_pnl', 'mean'),
+            avg_daily_unhedged_pnl=('unhedged_pnl', 'mean'),
+            hedged_volatility=('total_pnl', 'std'),
+            unhedged_volatility=('unhedged_pnl', 'std'),
+            max_daily_loss_hedged=('total_pnl', 'min'),
+            max_daily_loss_unhedged=('unhedged_pnl', 'min'),
+            profitable_days_hedged=('hedged_profitable', 'sum'),
+            profitable_days_unhedged=('unhedged_profitable', 'sum')
+        )
+
+        # VaR（分组5%分位数，线性插值与 np.percentile 一致）
+        var_95 = groups[['total_pnl', 'unhedged_pnl']].quantile(0.05)
+
+        # 最大回撤：在缓存的完整累计盈亏数组上按时期切片，逐段单次遍历
+        hedged_cum, unhedged_cum = self._get_cumulative_pnl(data)
+        period_rows = [slice(bounds[i][0], bounds[i][1] + 1) for i in stats.index.tolist()]
+        max_drawdown_hedged = [self._calculate_max_drawdown(hedged_cum[rows]) for rows in period_rows]
+        max_drawdown_unhedged = [self._calculate_max_drawdown(unhedged_cum[rows]) for rows in period_rows]
+
+        # 派生指标
+        stats['profitable_days_ratio_hedged'] = stats['profitable_days_hedged'] / stats['days']
+        stats['profitable_days_ratio_unhedged'] = stats['profitable_days_unhedged'] / stats['days']
+        stats['var_95_hedged'] = var_95['total_pnl']
+        stats['var_95_unhedged'] = var_95['unhedged_pnl']
+        stats['hedge_advantage'] = stats['total_hedged_pnl'] - stats['total_unhedged_pnl']
+        unhedged_volatility = stats['unhedged_volatility']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stats['risk_reduction_rate'] = np.where(
+                unhedged_volatility > 0,
+                (unhedged_volatility - stats['hedged_volatility']) / unhedged_volatility,
+                0
+            )
+        stats['max_drawdown_hedged'] = max_drawdown_hedged
+        stats['max_drawdown_unhedged'] = max_drawdown_unhedged
+
+        # 组装结果（与单时期结果字段顺序一致；无数据的时期返回空字典）
+        field_order = [
+            'days', 'total_hedged_pnl', 'total_unhedged_pnl', 'total_spot_pnl', 'total_future_pnl',
+            'avg_daily_hedged_pnl', 'avg_daily_unhedged_pnl', 'hedged_volatility', 'unhedged_volatility',
+            'max_daily_loss_hedged', 'max_daily_loss_unhedged',
+            'profitable_days_hedged', 'profitable_days_unhedged',
+            'profitable_days_ratio_hedged', 'profitable_days_ratio_unhedged',
+            'var_95_hedged', 'var_95_unhedged', 'hedge_advantage', 'risk_reduction_rate',
+            'max_drawdown_hedged', 'max_drawdown_unhedged'
+        ]
+        records = dict(zip(stats.index.tolist(), stats[field_order].to_dict('records')))
+        return [records.get(i, {}) for i in range(len(bounds))]
+
+    def _get_cumulative_pnl(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        获取完整回测数据的累计盈亏数组（同一份数据只取一次，各时期按行位置切片）
+
+        Args:
+            data: 回测数据
+
+        Returns:
+            (套保累计盈亏, 未套保累计盈亏)，均为只读数组
+        """
+        cache = self._cumulative_pnl_cache
+        if cache is not None and cache[0] is data:
+            return cache[1], cache[2]
+
+        hedged_cum = data['total_pnl_cumulative'].to_numpy(dtype=np.float64, copy=True)
+        unhedged_cum = data['unhedged_pnl_cumulative'].to_numpy(dtype=np.float64, copy=True)
+        hedged_cum.flags.writeable = False
+        unhedged_cum.flags.writeable = False
+
+        self._cumulative_pnl_cache = (data, hedged_cum, unhedged_cum)
+        return hedged_cum, unhedged_cum
+
     def _calculate_period_performance(self,
                                     period_data: pd.DataFrame,
-                                    hedge_params: Dict) -> Dict:
+                                    cumulative_pnl: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict:
         """
         计算时期绩效
 
         Args:
             period_data: 时期数据
-            hedge_params: 套保参数
+            cumulative_pnl: 该时期的 (套保累计盈亏, 未套保累计盈亏) 数组切片，为None时从时期数据中读取
 
         Returns:
             时期绩效结果
@@ -258,54 +482,64 @@ class StressTestAnalyzer:
         if period_data.empty:
             return {}
 
+        # 热点列只取一次NumPy数组，所有统计量直接在数组上计算
+        hedged_pnl = period_data['total_pnl'].to_numpy(dtype=np.float64)
+        unhedged_pnl = period_data['unhedged_pnl'].to_numpy(dtype=np.float64)
+        days = hedged_pnl.size
+
+        if cumulative_pnl is None:
+            cumulative_pnl = (period_data['total_pnl_cumulative'].to_numpy(dtype=np.float64),
+                              period_data['unhedged_pnl_cumulative'].to_numpy(dtype=np.float64))
+        hedged_cum, unhedged_cum = cumulative_pnl
+
         # 基础统计
-        total_hedged_pnl = period_data['total_pnl'].sum()
-        total_unhedged_pnl = period_data['unhedged_pnl'].sum()
-        total_spot_pnl = period_data['spot_pnl'].sum()
-        total_future_pnl = period_data['future_pnl'].sum()
+        total_hedged_pnl = hedged_pnl.sum()
+        total_unhedged_pnl = unhedged_pnl.sum()
+        total_spot_pnl = period_data['spot_pnl'].to_numpy(dtype=np.float64).sum()
+        total_future_pnl = period_data['future_pnl'].to_numpy(dtype=np.float64).sum()
 
-        # 风险指标
-        hedged_volatility = period_data['total_pnl'].std()
-        unhedged_volatility = period_data['unhedged_pnl'].std()
+        # 风险指标（样本标准差，单日时期为NaN，与pandas一致）
+        hedged_volatility = hedged_pnl.std(ddof=1) if days > 1 else np.nan
+        unhedged_volatility = unhedged_pnl.std(ddof=1) if days > 1 else np.nan
 
         # 极端损失
-        max_daily_loss_hedged = period_data['total_pnl'].min()
-        max_daily_loss_unhedged = period_data['unhedged_pnl'].min()
+        max_daily_loss_hedged = hedged_pnl.min()
+        max_daily_loss_unhedged = unhedged_pnl.min()
 
         # 盈利天数
-        profitable_days_hedged = (period_data['total_pnl'] > 0).sum()
-        profitable_days_unhedged = (period_data['unhedged_pnl'] > 0).sum()
+        profitable_days_hedged = np.count_nonzero(hedged_pnl > 0)
+        profitable_days_unhedged = np.count_nonzero(unhedged_pnl > 0)
 
-        # VaR
-        var_95_hedged = np.percentile(period_data['total_pnl'], 5)
-        var_95_unhedged = np.percentile(period_data['unhedged_pnl'], 5)
+        # VaR（np.partition 选取次序统计量，结果与线性插值分位数一致）
+        var_95_hedged = BacktestEngine._calculate_var(hedged_pnl)
+        var_95_unhedged = BacktestEngine._calculate_var(unhedged_pnl)
 
         # 套保优势
         hedge_advantage = total_hedged_pnl - total_unhedged_pnl
         risk_reduction = (unhedged_volatility - hedged_volatility) / unhedged_volatility if unhedged_volatility > 0 else 0
 
         result = {
-            'days': len(period_data),
+            'days': days,
             'total_hedged_pnl': total_hedged_pnl,
             'total_unhedged_pnl': total_unhedged_pnl,
             'total_spot_pnl': total_spot_pnl,
             'total_future_pnl': total_future_pnl,
-            'avg_daily_hedged_pnl': period_data['total_pnl'].mean(),
-            'avg_daily_unhedged_pnl': period_data['unhedged_pnl'].mean(),
+            'avg_daily_hedged_pnl': hedged_pnl.mean(),
+            'avg_daily_unhedged_pnl': unhedged_pnl.mean(),
             'hedged_volatility': hedged_volatility,
             'unhedged_volatility': unhedged_volatility,
             'max_daily_loss_hedged': max_daily_loss_hedged,
             'max_daily_loss_unhedged': max_daily_loss_unhedged,
             'profitable_days_hedged': profitable_days_hedged,
             'profitable_days_unhedged': profitable_days_unhedged,
-            'profitable_days_ratio_hedged': profitable_days_hedged / len(period_data),
-            'profitable_days_ratio_unhedged': profitable_days_unhedged / len(period_data),
+            'profitable_days_ratio_hedged': profitable_days_hedged / days,
+            'profitable_days_ratio_unhedged': profitable_days_unhedged / days,
             'var_95_hedged': var_95_hedged,
             'var_95_unhedged': var_95_unhedged,
             'hedge_advantage': hedge_advantage,
             'risk_reduction_rate': risk_reduction,
-            'max_drawdown_hedged': self._calculate_max_drawdown(period_data['total_pnl_cumulative']),
-            'max_drawdown_unhedged': self._calculate_max_drawdown(period_data['unhedged_pnl_cumulative'])
+            'max_drawdown_hedged': self._calculate_max_drawdown(hedged_cum),
+            'max_drawdown_unhedged': self._calculate_max_drawdown(unhedged_cum)
         }
 
         return result
@@ -321,23 +555,28 @@ class StressTestAnalyzer:
             正常时期分析结果
         """
         if self.stress_periods:
-            # 排除压力时期，获取正常时期数据
-            normal_data = data.copy()
-
-            for period in self.stress_periods:
-                start_idx = period['start_index']
-                end_idx = period['end_index']
-                normal_data = normal_data.drop(normal_data.index[start_idx:end_idx+1])
+            # 排除压力时期，获取正常时期数据（按列式存储的起止位置差分累加得到覆盖计数，一次布尔掩码筛选）
+            n = len(data)
+            coverage = np.zeros(n + 1, dtype=np.int64)
+            np.add.at(coverage, np.minimum(self.stress_periods_arr['start_index'], n), 1)
+            np.add.at(coverage, np.minimum(self.stress_periods_arr['end_index'] + 1, n), -1)
+            mask = np.cumsum(coverage[:n]) == 0
+
+            normal_data = data.iloc[mask]
         else:
             # 如果没有压力时期，使用所有数据
+            mask = slice(None)
             normal_data = data
 
         if normal_data.empty:
             # 如果没有正常时期数据，使用整个时期
+            mask = slice(None)
             normal_data = data
 
-        hedge_params = {'hedge_direction': 'short_hedge'}  # 默认参数，仅用于计算
-        normal_result = self._calculate_period_performance(normal_data, hedge_params)
+        hedged_cum, unhedged_cum = self._get_cumulative_pnl(data)
+        normal_result = self._calculate_period_performance(
+            normal_data, (hedged_cum[mask], unhedged_cum[mask])
+        )
         normal_result['period_info'] = {
             'duration_days': len(normal_data),
             'stress_type': '正常时期'
@@ -362,15 +601,19 @@ class StressTestAnalyzer:
             return {}
 
         # 聚合压力时期结果
-        total_stress_days = sum(p['days'] for p in stress_periods_results)
-        total_stress_pnl_hedged = sum(p['total_hedged_pnl'] for p in stress_periods_results)
-        total_stress_pnl_unhedged = sum(p['total_unhedged_pnl'] for p in stress_periods_results)
-
-        avg_volatility_hedged = np.mean([p['hedged_volatility'] for p in stress_periods_results])
-        avg_volatility_unhedged = np.mean([p['unhedged_volatility'] for p in stress_periods_results])
-
-        max_loss_hedged = min(p['max_daily_loss_hedged'] for p in stress_periods_results)
-        max_loss_unhedged = min(p['max_daily_loss_unhedged'] for p in stress_periods_results)
+        aggregated = aggregate_period_metrics(
+            stress_periods_results,
+            sum_fields=('days', 'total_hedged_pnl', 'total_unhedged_pnl'),
+            mean_fields=('hedged_volatility', 'unhedged_volatility'),
+            min_fields=('max_daily_loss_hedged', 'max_daily_loss_unhedged')
+        )
+        total_stress_days = int(aggregated['days'])
+        total_stress_pnl_hedged = aggregated['total_hedged_pnl']
+        total_stress_pnl_unhedged = aggregated['total_unhedged_pnl']
+        avg_volatility_hedged = aggregated['hedged_volatility']
+        avg_volatility_unhedged = aggregated['unhedged_volatility']
+        max_loss_hedged = aggregated['max_daily_loss_hedged']
+        max_loss_unhedged = aggregated['max_daily_loss_unhedged']
 
         # 计算相对表现
         stress_vs_normal_pnl_ratio = (total_stress_pnl_hedged / total_stress_days) / normal_result['avg_daily_hedged_pnl'] if normal_result['avg_daily_hedged_pnl'] != 0 else 0
@@ -404,13 +647,12 @@ class StressTestAnalyzer:
         Returns:
             最大回撤值
         """
-        if cumulative_series.empty:
+        values = np.asarray(cumulative_series, dtype=np.float64)
+        if values.size == 0:
             return 0
 
-        peak = cumulative_series.expanding().max()
-        drawdown = cumulative_series - peak
-        max_drawdown = drawdown.min()
-        return max_drawdown
+        # 单次遍历同时维护峰值与回撤（未安装numba时为 np.maximum.accumulate 实现）
+        return float(_max_drawdown_kernel(values))
 
     def generate_stress_test_report(self) -> str:
         """
@@ -422,96 +664,101 @@ class StressTestAnalyzer:
         if not self.stress_results:
             return "请先运行压力测试"
 
-        report = []
-        report.append("## 压力测试报告\n")
+        buf = io.StringIO()
+        w = buf.write
+        w("## 压力测试报告\n\n")
 
         # 测试概述
         summary = self.stress_results.get('summary', {})
         if summary:
-            report.append(f"### 测试概述")
-            report.append(f"- 识别压力时期数量: {summary.get('total_stress_periods', 0)}个")
-            report.append(f"- 压力时期总天数: {summary.get('total_stress_days', 0)}天")
-            report.append(f"- 压力时期套保总盈亏: {summary.get('total_stress_pnl_hedged', 0):.2f}")
-            report.append(f"- 压力时期未套保总盈亏: {summary.get('total_stress_pnl_unhedged', 0):.2f}")
-            report.append(f"- 压力时期套保有效性: {summary.get('stress_effectiveness', 0):.2%}")
-            report.append("")
-
-        # 各压力时期详情
+            w("### 测试概述\n"
+              f"- 识别压力时期数量: {summary.get('total_stress_periods', 0)}个\n"
+              f"- 压力时期总天数: {summary.get('total_stress_days', 0)}天\n"
+              f"- 压力时期套保总盈亏: {summary.get('total_stress_pnl_hedged', 0):.2f}\n"
+              f"- 压力时期未套保总盈亏: {summary.get('total_stress_pnl_unhedged', 0):.2f}\n"
+              f"- 压力时期套保有效性: {summary.get('stress_effectiveness', 0):.2%}\n\n")
+
+        # 各压力时期详情（每个时期整块写入）
         stress_periods = self.stress_results.get('stress_periods', [])
         if stress_periods:
-            report.append("### 各压力时期详情")
+            w("### 各压力时期详情\n")
 
             for i, period in enumerate(stress_periods, 1):
                 period_info = period.get('period_info', {})
-                report.append(f"**时期 {i}: {period_info.get('stress_type', '未知')}**")
-                report.append(f"- 时间: {period_info.get('start_date', '')} 至 {period_info.get('end_date', '')}")
-                report.append(f"- 持续天数: {period_info.get('duration_days', 0)}天")
-                report.append(f"- 套保盈亏: {period.get('total_hedged_pnl', 0):.2f}")
-                report.append(f"- 未套保盈亏: {period.get('total_unhedged_pnl', 0):.2f}")
-                report.append(f"- 套保优势: {period.get('hedge_advantage', 0):.2f}")
-                report.append(f"- 最大单日亏损(套保): {period.get('max_daily_loss_hedged', 0):.2f}")
-                report.append(f"- 最大单日亏损(未套保): {period.get('max_daily_loss_unhedged', 0):.2f}")
-                report.append("")
+                w(f"**时期 {i}: {period_info.get('stress_type', '未知')}**\n"
+                  f"- 时间: {period_info.get('start_date', '')} 至 {period_info.get('end_date', '')}\n"
+                  f"- 持续天数: {period_info.get('duration_days', 0)}天\n"
+                  f"- 套保盈亏: {period.get('total_hedged_pnl', 0):.2f}\n"
+                  f"- 未套保盈亏: {period.get('total_unhedged_pnl', 0):.2f}\n"
+                  f"- 套保优势: {period.get('hedge_advantage', 0):.2f}\n"
+                  f"- 最大单日亏损(套保): {period.get('max_daily_loss_hedged', 0):.2f}\n"
+                  f"- 最大单日亏损(未套保): {period.get('max_daily_loss_unhedged', 0):.2f}\n\n")
 
         # 正常时期对比
         normal_period = self.stress_results.get('normal_period_comparison', {})
         if normal_period:
-            report.append("### 正常时期对比")
-            report.append(f"- 正常时期天数: {normal_period.get('days', 0)}天")
-            report.append(f"- 正常时期套保盈亏: {normal_period.get('total_hedged_pnl', 0):.2f}")
-            report.append(f"- 正常时期未套保盈亏: {normal_period.get('total_unhedged_pnl', 0):.2f}")
-            report.append("")
+            w("### 正常时期对比\n"
+              f"- 正常时期天数: {normal_period.get('days', 0)}天\n"
+              f"- 正常时期套保盈亏: {normal_period.get('total_hedged_pnl', 0):.2f}\n"
+              f"- 正常时期未套保盈亏: {normal_period.get('total_unhedged_pnl', 0):.2f}\n\n")
 
         # 结论与建议
-        report.append("### 结论与建议")
+        w("### 结论与建议\n")
 
         if summary and summary.get('stress_effectiveness', 0) > 0.5:
-            report.append("✅ **套保策略在压力时期表现良好**")
-            report.append("- 套保有效降低了极端行情下的风险")
-            report.append("- 建议维持当前套保策略")
+            w("✅ **套保策略在压力时期表现良好**\n"
+              "- 套保有效降低了极端行情下的风险\n"
+              "- 建议维持当前套保策略")
         elif summary and summary.get('stress_effectiveness', 0) > 0.2:
-            report.append("⚠️ **套保策略在压力时期表现中等**")
-            report.append("- 套保起到一定风险降低作用，但效果有限")
-            report.append("- 建议优化套保比例或考虑其他风险管理工具")
+            w("⚠️ **套保策略在压力时期表现中等**\n"
+              "- 套保起到一定风险降低作用，但效果有限\n"
+              "- 建议优化套保比例或考虑其他风险管理工具")
         else:
-            report.append("❌ **套保策略在压力时期表现不佳**")
-            report.append("- 套保未能有效降低极端风险")
-            report.append("- 建议重新评估套保策略和风险管理方法")
+            w("❌ **套保策略在压力时期表现不佳**\n"
+              "- 套保未能有效降低极端风险\n"
+              "- 建议重新评估套保策略和风险管理方法")
 
-        return "\n".join(report)
+        return buf.getvalue()
 
-    def export_stress_test_results(self, file_path: str) -> None:
+    def export_stress_test_results(self,
+                                   file_path: Union[str, BinaryIO],
+                                   file_format: str = "csv") -> None:
         """
         导出压力测试结果
 
         Args:
-            file_path: 导出文件路径
+            file_path: 导出文件路径或可写的二进制缓冲区（如 io.BytesIO，可直接用于下载而无需落盘）
+            file_format: 导出格式 ("csv" 或 "parquet")
         """
         if not self.stress_results:
             raise ValueError("没有可导出的压力测试结果")
 
-        # 准备导出数据
-        export_data = []
-
-        # 添加各压力时期数据
-        for i, period in enumerate(self.stress_results.get('stress_periods', []), 1):
-            period_info = period.get('period_info', {})
-            export_data.append({
-                '时期编号': i,
-                '类型': period_info.get('stress_type', ''),
-                '开始日期': period_info.get('start_date', ''),
-                '结束日期': period_info.get('end_date', ''),
-                '持续天数': period_info.get('duration_days', 0),
-                '套保总盈亏': period.get('total_hedged_pnl', 0),
-                '未套保总盈亏': period.get('total_unhedged_pnl', 0),
-                '套保优势': period.get('hedge_advantage', 0),
-                '套保波动率': period.get('hedged_volatility', 0),
-                '未套保波动率': period.get('unhedged_volatility', 0),
-                '风险降低率': period.get('risk_reduction_rate', 0),
-                '最大单日亏损(套保)': period.get('max_daily_loss_hedged', 0),
-                '最大单日亏损(未套保)': period.get('max_daily_loss_unhedged', 0)
-            })
-
-        # 导出为CSV
-        df = pd.DataFrame(export_data)
-        df.to_csv(file_path, index=False, encoding='utf-8-sig')
\ No newline at end of file
+        # 准备导出数据（按列构建，一次性生成DataFrame）
+        periods = self.stress_results.get('stress_periods', [])
+        infos = [period.get('period_info', {}) for period in periods]
+
+        def metric_column(key: str) -> List:
+            return [period.get(key, 0) for period in periods]
+
+        df = pd.DataFrame({
+            '时期编号': np.arange(1, len(periods) + 1),
+            '类型': pd.Categorical([info.get('stress_type') for info in infos], dtype=STRESS_TYPE_DTYPE),
+            '开始日期': [info.get('start_date', '') for info in infos],
+            '结束日期': [info.get('end_date', '') for info in infos],
+            '持续天数': [info.get('duration_days', 0) for info in infos],
+            '套保总盈亏': metric_column('total_hedged_pnl'),
+            '未套保总盈亏': metric_column('total_unhedged_pnl'),
+            '套保优势': metric_column('hedge_advantage'),
+            '套保波动率': metric_column('hedged_volatility'),
+            '未套保波动率': metric_column('unhedged_volatility'),
+            '风险降低率': metric_column('risk_reduction_rate'),
+            '最大单日亏损(套保)': metric_column('max_daily_loss_hedged'),
+            '最大单日亏损(未套保)': metric_column('max_daily_loss_unhedged')
+        })
+
+        if file_format == "parquet":
+            # 导出为Parquet（列式存储，ZSTD压缩）
+            df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
+        else:
+            # 导出为CSV
+            df.to_csv(file_path, index=False, encoding='utf-8-sig')
\ No newline at end of file
@@ -5,18 +5,233 @@
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 import streamlit as st
 from typing import Dict, List, Optional, Tuple
-import pyecharts.options as opts
-from pyecharts.charts import Line, Bar, Radar, Scatter
+
+from backtest_engine import PerformanceMetrics
+
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖，缺失时直接以NumPy执行
+    njit = None
+
+
+def _lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    LTTB（Largest-Triangle-Three-Buckets）降采样，返回保留点的位置
+
+    以行位置作为横坐标：首尾点固定保留，中间按桶划分，每桶保留与前一保留点、
+    下一桶均值点构成三角形面积最大的点，从而保留走势的峰谷形态。
+
+    Args:
+        values: 纵坐标数组（不含NaN）
+        n_out: 保留点数
+
+    Returns:
+        保留点的行位置数组（升序）
+    """
+    n = values.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        # 当前桶与下一桶的范围（最后一桶的下一桶即末点）
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (end + next_end - 1) / 2.0
+        avg_y = values[end:next_end].mean()
+
+        # 三角形面积（省略常数1/2）
+        bucket_x = np.arange(start, end)
+        area = np.abs((a - avg_x) * (values[start:end] - values[a])
+                      - (a - bucket_x) * (avg_y - values[a]))
+        a = start + np.argmax(area)
+        indices[i + 1] = a
+    return indices
+
+
+if njit is not None:
+    _lttb_kernel = njit(cache=True)(_lttb_indices)
+else:
+    _lttb_kernel = _lttb_indices
+
+
+def _compact_floats(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    在不影响显示精度的前提下将图表数据降为float32（图表JSON中数组字节数减半）
+
+    float32 的舍入误差不超过 |x|·2^-24，小于显示精度的半个单位时才降精度，
+    否则（如数值较大的累计盈亏）保持float64。
+
+    Args:
+        values: float64 数组
+        decimals: 悬停提示显示的小数位数
+
+    Returns:
+        float32 或原 float64 数组
+    """
+    finite = values[np.isfinite(values)]
+    max_abs = np.abs(finite).max(initial=0.0)
+    if max_abs * 2.0 ** -24 < 0.5 * 10.0 ** -decimals:
+        return values.astype(np.float32)
+    return values
+
+
+# 雷达图各指标是否越小越好（波动率、最大回撤、VaR），其余越大越好
+_RADAR_LOWER_IS_BETTER = np.array([True, True, True, False, False])
+# 取绝对值后再比较的指标（最大回撤、VaR、夏普比率）
+_RADAR_USE_ABS = np.array([False, True, True, True, False])
+
+
+def _normalize_radar(raw: np.ndarray) -> np.ndarray:
+    """
+    将套保/未套保两组指标按列标准化到0-1范围（支持批量：前置维度逐组独立标准化）
+
+    Args:
+        raw: 形状为 (..., 2, 5) 的指标数组，倒数第二维两行分别为套保/未套保
+
+    Returns:
+        标准化后的同形状数组；某组某列最大值不为正时该列为0
+    """
+    values = np.where(_RADAR_USE_ABS, np.abs(raw), raw)
+    col_max = values.max(axis=-2, keepdims=True)
+    positive = col_max > 0
+    ratio = np.divide(values, col_max, out=np.zeros_like(values), where=positive)
+    return np.where(positive, np.where(_RADAR_LOWER_IS_BETTER, 1 - ratio, ratio), 0.0)
+
+
+@st.cache_data(show_spinner=False)
+def build_summary_tables(summary: Dict) -> Tuple[pa.Table, pa.Table]:
+    """
+    构建盈亏表现表和风险控制表（按摘要内容缓存，仪表板与详细分析结果共用）
+
+    直接构建Arrow表，st.dataframe无需再经pandas转换为Arrow
+
+    Args:
+        summary: BacktestEngine.generate_performance_summary() 返回的已格式化绩效摘要
+
+    Returns:
+        (盈亏表现表, 风险控制表)
+    """
+    pnl = summary['盈亏表现']
+    pnl_table = pa.table({
+        '指标': ['套保总盈亏', '未套保总盈亏', '套保优势', '平均每日盈亏(套保)', '平均每日盈亏(未套保)'],
+        '数值': [
+            pnl['套保总盈亏'],
+            pnl['未套保总盈亏'],
+            pnl['套保优势'],
+            pnl['平均每日盈亏（套保）'],
+            pnl['平均每日盈亏（未套保）']
+        ]
+    })
+
+    risk = summary['风险控制']
+    risk_table = pa.table({
+        '指标': ['套保波动率', '未套保波动率', '波动率降低率', '最大回撤(套保)', '最大回撤(未套保)'],
+        '数值': [
+            risk['套保波动率'],
+            risk['未套保波动率'],
+            risk['波动率降低'],
+            risk['最大回撤（套保）'],
+            risk['最大回撤（未套保）']
+        ]
+    })
+
+    return pnl_table, risk_table
+
+
+def _render_metric_cards(summary: Dict) -> None:
+    """
+    渲染绩效指标卡片
+
+    Args:
+        summary: 绩效摘要字典
+    """
+    # 创建指标卡片
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric(
+            label="套保总盈亏",
+            value=summary['盈亏表现']['套保总盈亏'],
+            delta=summary['盈亏表现']['套保优势']
+        )
+
+    with col2:
+        st.metric(
+            label="风险降低率",
+            value=summary['风险控制']['波动率降低'],
+            delta=None
+        )
+
+    with col3:
+        st.metric(
+            label="套保有效性",
+            value=summary['风险控制']['套保有效性'],
+            delta=None
+        )
+
+    with col4:
+        st.metric(
+            label="夏普比率",
+            value=summary['其他指标']['夏普比率（套保）'],
+            delta=None
+        )
+
+
+def _render_detail_tables(summary: Dict) -> None:
+    """
+    渲染详细绩效指标表
+
+    Args:
+        summary: 绩效摘要字典
+    """
+    # 显示详细表格（表格按摘要内容缓存，重新运行时直接复用）
+    st.subheader("详细绩效指标")
+    pnl_table, risk_table = build_summary_tables(summary)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**盈亏表现**")
+        st.dataframe(pnl_table, hide_index=True)
+
+    with col2:
+        st.markdown("**风险控制**")
+        st.dataframe(risk_table, hide_index=True)
 
 
 class Visualizer:
     """可视化器类"""
 
+    # 悬停提示模板（类级常量，各次绘图共享同一字符串对象）
+    _HT_SPOT = '日期: %{x}<br>现货价格: %{y:.2f}<extra></extra>'
+    _HT_FUTURE = '日期: %{x}<br>期货价格: %{y:.2f}<extra></extra>'
+    _HT_PRICE_DENSITY = '现货价格: %{x:.2f}<br>期货价格: %{y:.2f}<br>频次: %{z}<extra></extra>'
+    _HT_PRICE_SCATTER = '现货价格: %{x:.2f}<br>期货价格: %{y:.2f}<extra></extra>'
+    _HT_HEDGED_CUMULATIVE = '日期: %{x}<br>套保累计盈亏: %{y:.2f}<extra></extra>'
+    _HT_UNHEDGED_CUMULATIVE = '日期: %{x}<br>未套保累计盈亏: %{y:.2f}<extra></extra>'
+    _HT_HEDGED_DAILY = '日期: %{x}<br>套保每日盈亏: %{y:.2f}<extra></extra>'
+    _HT_PNL_BIN = '盈亏区间: %{customdata[0]:.2f} ~ %{customdata[1]:.2f}<br>频次: %{y}<extra></extra>'
+    _HT_OPTIMAL_RATIO = '最优套保比例: %{x:.4f}<extra></extra>'
+    _HT_METRIC_VALUE = '指标: %{x}<br>数值: %{y:.2f}<extra></extra>'
+    # 敏感性分析各子图折线，按指标名称索引
+    _HT_SENSITIVITY = {
+        '风险降低率': '套保比例: %{x:.4f}<br>风险降低率: %{y:.2f}%<extra></extra>',
+        '套保有效性': '套保比例: %{x:.4f}<br>套保有效性: %{y:.2f}%<extra></extra>',
+        '波动率': '套保比例: %{x:.4f}<br>波动率: %{y:.4f}<extra></extra>',
+        '风险调整收益': '套保比例: %{x:.4f}<br>风险调整收益: %{y:.4f}<extra></extra>'
+    }
+
     def __init__(self):
         """初始化可视化器"""
         self.color_scheme = {
@@ -27,17 +242,67 @@ class Visualizer:
             'warning': '#ff7f0e',
             'info': '#17a2b8'
         }
+        # 数据点超过该阈值时使用WebGL渲染（Scattergl）
+        self.webgl_threshold = 1000
+        # 散点模式每个点都是一个SVG节点（折线只是一条路径），更早切换到WebGL
+        self.webgl_marker_threshold = 200
+        # 时间序列折线最多发送到浏览器的点数，超过时用LTTB降采样
+        self.max_line_points = 2000
+        # 相关性散点超过该点数时改为二维直方图热力图（点大量重叠，密度更直观）
+        self.density_threshold = 5000
+        self.density_bins = 60
+        # 各类图表的静态骨架（子图网格、布局、坐标轴标题），首次使用时构建
+        self._skeletons: Dict[str, go.Figure] = {}
+
+    def _figure_from_skeleton(self, kind: str) -> go.Figure:
+        """
+        复制指定类型图表的静态骨架作为新图表（骨架只构建一次，之后只需复制）
 
-    def plot_price_comparison(self, data: pd.DataFrame) -> go.Figure:
+        Args:
+            kind: 图表类型，对应 _<kind>_skeleton 方法
+
+        Returns:
+            仅含布局、尚无数据的Plotly图表对象
         """
-        绘制现货与期货价格对比图
+        skeleton = self._skeletons.get(kind)
+        if skeleton is None:
+            skeleton = getattr(self, f"_{kind}_skeleton")()
+            self._skeletons[kind] = skeleton
+        return go.Figure(skeleton)
+
+    def _downsample_line(self, dates: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        对时间序列折线做LTTB降采样（点数不超过 max_line_points 时原样返回）
 
         Args:
-            data: 包含现货和期货价格的数据
+            dates: 日期数组
+            values: 数值数组（float64）
 
         Returns:
-            Plotly图表对象
+            (日期数组, 数值数组)
         """
+        if values.size <= self.max_line_points:
+            return dates, values
+
+        indices = _lttb_kernel(values, self.max_line_points)
+        return dates[indices], values[indices]
+
+    def _scatter_cls(self, n_points: int, markers: bool = False):
+        """
+        根据数据点数量选择散点/折线轨迹类型
+
+        Args:
+            n_points: 数据点数量
+            markers: 是否为散点模式
+
+        Returns:
+            go.Scattergl（大数据量，GPU渲染）或 go.Scatter（SVG渲染）
+        """
+        threshold = self.webgl_marker_threshold if markers else self.webgl_threshold
+        return go.Scattergl if n_points > threshold else go.Scatter
+
+    def _price_skeleton(self) -> go.Figure:
+        """价格对比图的静态骨架"""
         fig = make_subplots(
             rows=2, cols=1,
             subplot_titles=('价格走势对比', '价格相关性'),
@@ -45,65 +310,163 @@ class Visualizer:
             row_heights=[0.7, 0.3]
         )
 
+        # 设置布局
+        fig.update_layout(
+            title='现货与期货价格对比分析',
+            height=800,
+            hovermode='x unified',
+            uirevision='constant',
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
+        )
+
+        # 设置Y轴
+        fig.update_yaxes(title_text="现货价格", row=1, col=1)
+        fig.update_yaxes(title_text="期货价格", row=1, col=1, secondary_y=True)
+        fig.update_yaxes(title_text="期货价格", row=2, col=1)
+        fig.update_xaxes(title_text="现货价格", row=2, col=1)
+        fig.update_xaxes(title_text="日期", row=1, col=1)
+
+        return fig
+
+    def _pnl_skeleton(self) -> go.Figure:
+        """盈亏对比图的静态骨架"""
+        fig = make_subplots(
+            rows=3, cols=1,
+            subplot_titles=('累计盈亏对比', '每日盈亏', '盈亏分布'),
+            vertical_spacing=0.12,
+            row_heights=[0.5, 0.3, 0.2]
+        )
+
+        # 每日盈亏零线（骨架尚无数据，需包含空子图）
+        fig.add_hline(y=0, line_dash="dash", line_color="gray", row=2, col=1,
+                      exclude_empty_subplots=False)
+
+        # 设置布局
+        fig.update_layout(
+            title='套保效果对比分析',
+            height=900,
+            hovermode='x unified',
+            uirevision='constant',
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            ),
+            barmode='overlay'
+        )
+
+        # 设置轴标签
+        fig.update_yaxes(title_text="累计盈亏", row=1, col=1)
+        fig.update_yaxes(title_text="每日盈亏", row=2, col=1)
+        fig.update_yaxes(title_text="频次", row=3, col=1)
+        fig.update_xaxes(title_text="日期", row=2, col=1)
+        fig.update_xaxes(title_text="盈亏", row=3, col=1)
+
+        return fig
+
+    def _sensitivity_skeleton(self) -> go.Figure:
+        """敏感性分析图的静态骨架"""
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('风险降低率 vs 套保比例', '套保有效性 vs 套保比例',
+                          '波动率 vs 套保比例', '夏普比率 vs 套保比例'),
+            vertical_spacing=0.15,
+            horizontal_spacing=0.1
+        )
+
+        fig.update_layout(
+            title='套保比例敏感性分析',
+            height=700,
+            hovermode='x'
+        )
+
+        # 设置轴标签
+        fig.update_xaxes(title_text="套保比例", row=2, col=1)
+        fig.update_xaxes(title_text="套保比例", row=2, col=2)
+        fig.update_yaxes(title_text="风险降低率 (%)", row=1, col=1)
+        fig.update_yaxes(title_text="套保有效性 (%)", row=1, col=2)
+        fig.update_yaxes(title_text="波动率", row=2, col=1)
+        fig.update_yaxes(title_text="风险调整收益", row=2, col=2)
+
+        return fig
+
+    def plot_price_comparison(self, data: pd.DataFrame) -> go.Figure:
+        """
+        绘制现货与期货价格对比图
+
+        Args:
+            data: 包含现货和期货价格的数据
+
+        Returns:
+            Plotly图表对象
+        """
+        # 各列只取一次NumPy数组
+        dates = data['date'].to_numpy()
+        spot_prices = data['spot_price'].to_numpy(dtype=np.float64)
+        future_prices = data['future_price'].to_numpy(dtype=np.float64)
+
+        scatter = self._scatter_cls(min(len(data), self.max_line_points))
+        spot_x, spot_y = self._downsample_line(dates, spot_prices)
+        future_x, future_y = self._downsample_line(dates, future_prices)
+
+        fig = self._figure_from_skeleton('price')
+
         # 价格走势
         fig.add_trace(
-            go.Scatter(
-                x=data['date'],
-                y=data['spot_price'],
+            scatter(
+                x=spot_x,
+                y=_compact_floats(spot_y, 2),
                 mode='lines',
                 name='现货价格',
                 line=dict(color=self.color_scheme['primary'], width=2),
-                hovertemplate='日期: %{x}<br>现货价格: %{y:.2f}<extra></extra>'
+                hovertemplate=self._HT_SPOT
             ),
             row=1, col=1
         )
 
         fig.add_trace(
-            go.Scatter(
-                x=data['date'],
-                y=data['future_price'],
+            scatter(
+                x=future_x,
+                y=_compact_floats(future_y, 2),
                 mode='lines',
                 name='期货价格',
                 line=dict(color=self.color_scheme['secondary'], width=2),
                 yaxis='y2',
-                hovertemplate='日期: %{x}<br>期货价格: %{y:.2f}<extra></extra>'
+                hovertemplate=self._HT_FUTURE
             ),
             row=1, col=1
         )
 
-        # 散点图展示相关性
-        fig.add_trace(
-            go.Scatter(
-                x=data['spot_price'],
-                y=data['future_price'],
+        # 散点图展示相关性（数据量大时服务端分箱为热力图，只发送 bins×bins 个格子）
+        if len(data) > self.density_threshold:
+            counts, x_edges, y_edges = np.histogram2d(spot_prices, future_prices, bins=self.density_bins)
+            correlation_trace = go.Heatmap(
+                z=np.where(counts.T > 0, counts.T, np.nan),
+                x=0.5 * (x_edges[:-1] + x_edges[1:]),
+                y=0.5 * (y_edges[:-1] + y_edges[1:]),
+                name='价格相关性',
+                colorscale='Blues',
+                showscale=False,
+                hovertemplate=self._HT_PRICE_DENSITY
+            )
+        else:
+            correlation_trace = self._scatter_cls(len(data), markers=True)(
+                x=_compact_floats(spot_prices, 2),
+                y=_compact_floats(future_prices, 2),
                 mode='markers',
                 name='价格相关性',
                 marker=dict(color=self.color_scheme['info'], size=4, opacity=0.6),
-                hovertemplate='现货价格: %{x:.2f}<br>期货价格: %{y:.2f}<extra></extra>'
-            ),
-            row=2, col=1
-        )
-
-        # 设置布局
-        fig.update_layout(
-            title='现货与期货价格对比分析',
-            height=800,
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
+                hovertemplate=self._HT_PRICE_SCATTER
             )
-        )
-
-        # 设置Y轴
-        fig.update_yaxes(title_text="现货价格", row=1, col=1)
-        fig.update_yaxes(title_text="期货价格", row=1, col=1, secondary_y=True)
-        fig.update_yaxes(title_text="期货价格", row=2, col=1)
-        fig.update_xaxes(title_text="现货价格", row=2, col=1)
-        fig.update_xaxes(title_text="日期", row=1, col=1)
+        fig.add_trace(correlation_trace, row=2, col=1)
 
         return fig
 
@@ -117,34 +480,40 @@ class Visualizer:
         Returns:
             Plotly图表对象
         """
-        fig = make_subplots(
-            rows=3, cols=1,
-            subplot_titles=('累计盈亏对比', '每日盈亏', '盈亏分布'),
-            vertical_spacing=0.12,
-            row_heights=[0.5, 0.3, 0.2]
-        )
+        # 各列只取一次NumPy数组
+        dates = backtest_data['date'].to_numpy()
+        hedged_pnl = backtest_data['total_pnl'].to_numpy(dtype=np.float64)
+        unhedged_pnl = backtest_data['unhedged_pnl'].to_numpy(dtype=np.float64)
+        hedged_cum = backtest_data['total_pnl_cumulative'].to_numpy(dtype=np.float64)
+        unhedged_cum = backtest_data['unhedged_pnl_cumulative'].to_numpy(dtype=np.float64)
+
+        scatter = self._scatter_cls(min(len(backtest_data), self.max_line_points))
+        hedged_x, hedged_y = self._downsample_line(dates, hedged_cum)
+        unhedged_x, unhedged_y = self._downsample_line(dates, unhedged_cum)
+
+        fig = self._figure_from_skeleton('pnl')
 
         # 累计盈亏对比
         fig.add_trace(
-            go.Scatter(
-                x=backtest_data['date'],
-                y=backtest_data['total_pnl_cumulative'],
+            scatter(
+                x=hedged_x,
+                y=_compact_floats(hedged_y, 2),
                 mode='lines',
                 name='套保累计盈亏',
                 line=dict(color=self.color_scheme['success'], width=2.5),
-                hovertemplate='日期: %{x}<br>套保累计盈亏: %{y:.2f}<extra></extra>'
+                hovertemplate=self._HT_HEDGED_CUMULATIVE
             ),
             row=1, col=1
         )
 
         fig.add_trace(
-            go.Scatter(
-                x=backtest_data['date'],
-                y=backtest_data['unhedged_pnl_cumulative'],
+            scatter(
+                x=unhedged_x,
+                y=_compact_floats(unhedged_y, 2),
                 mode='lines',
                 name='未套保累计盈亏',
                 line=dict(color=self.color_scheme['danger'], width=2.5, dash='dash'),
-                hovertemplate='日期: %{x}<br>未套保累计盈亏: %{y:.2f}<extra></extra>'
+                hovertemplate=self._HT_UNHEDGED_CUMULATIVE
             ),
             row=1, col=1
         )
@@ -152,74 +521,48 @@ class Visualizer:
         # 每日盈亏柱状图
         fig.add_trace(
             go.Bar(
-                x=backtest_data['date'],
-                y=backtest_data['total_pnl'],
+                x=dates,
+                y=_compact_floats(hedged_pnl, 2),
                 name='套保每日盈亏',
-                marker_color=[self.color_scheme['success'] if x >= 0 else self.color_scheme['danger']
-                             for x in backtest_data['total_pnl']],
-                hovertemplate='日期: %{x}<br>套保每日盈亏: %{y:.2f}<extra></extra>'
+                marker_color=np.where(hedged_pnl >= 0, self.color_scheme['success'], self.color_scheme['danger']),
+                hovertemplate=self._HT_HEDGED_DAILY
             ),
             row=2, col=1
         )
 
-        # 盈亏分布直方图
-        fig.add_trace(
-            go.Histogram(
-                x=backtest_data['total_pnl'],
-                name='套保盈亏分布',
-                nbinsx=30,
-                marker_color=self.color_scheme['success'],
-                opacity=0.7,
-                hovertemplate='盈亏区间: %{x}<br>频次: %{y}<extra></extra>'
-            ),
-            row=3, col=1
-        )
-
-        fig.add_trace(
-            go.Histogram(
-                x=backtest_data['unhedged_pnl'],
-                name='未套保盈亏分布',
-                nbinsx=30,
-                marker_color=self.color_scheme['danger'],
-                opacity=0.7,
-                hovertemplate='盈亏区间: %{x}<br>频次: %{y}<extra></extra>'
-            ),
-            row=3, col=1
-        )
-
-        # 添加零线
-        fig.add_hline(y=0, line_dash="dash", line_color="gray", row=2, col=1)
-
-        # 设置布局
-        fig.update_layout(
-            title='套保效果对比分析',
-            height=900,
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            barmode='overlay'
-        )
-
-        # 设置轴标签
-        fig.update_yaxes(title_text="累计盈亏", row=1, col=1)
-        fig.update_yaxes(title_text="每日盈亏", row=2, col=1)
-        fig.update_yaxes(title_text="频次", row=3, col=1)
-        fig.update_xaxes(title_text="日期", row=2, col=1)
-        fig.update_xaxes(title_text="盈亏", row=3, col=1)
+        # 盈亏分布直方图（服务端按同一组区间分箱，只发送30个柱子而非全部原始数据）
+        hedged_finite = hedged_pnl[np.isfinite(hedged_pnl)]
+        unhedged_finite = unhedged_pnl[np.isfinite(unhedged_pnl)]
+        edges = np.histogram_bin_edges(np.concatenate((hedged_finite, unhedged_finite)), bins=30)
+        centers = 0.5 * (edges[:-1] + edges[1:])
+        widths = np.diff(edges)
+        bin_ranges = np.column_stack((edges[:-1], edges[1:]))
+
+        for values, name, color in ((hedged_finite, '套保盈亏分布', self.color_scheme['success']),
+                                    (unhedged_finite, '未套保盈亏分布', self.color_scheme['danger'])):
+            counts, _ = np.histogram(values, bins=edges)
+            fig.add_trace(
+                go.Bar(
+                    x=centers,
+                    y=counts,
+                    width=widths,
+                    customdata=bin_ranges,
+                    name=name,
+                    marker_color=color,
+                    opacity=0.7,
+                    hovertemplate=self._HT_PNL_BIN
+                ),
+                row=3, col=1
+            )
 
         return fig
 
-    def plot_risk_metrics_radar(self, metrics: Dict) -> go.Figure:
+    def plot_risk_metrics_radar(self, metrics: PerformanceMetrics) -> go.Figure:
         """
         绘制风险指标雷达图
 
         Args:
-            metrics: 绩效指标字典
+            metrics: 回测绩效指标
 
         Returns:
             Plotly图表对象
@@ -227,28 +570,14 @@ class Visualizer:
         # 准备数据
         categories = ['波动率', '最大回撤', 'VaR(95%)', '夏普比率', '盈利天数占比']
 
-        # 标准化数值（0-1范围）
-        max_volatility = max(metrics['hedged_volatility'], metrics['unhedged_volatility'])
-        max_drawdown = max(abs(metrics['max_drawdown_hedged']), abs(metrics['max_drawdown_unhedged']))
-        max_var = max(abs(metrics['var_95_hedged']), abs(metrics['var_95_unhedged']))
-        max_sharpe = max(abs(metrics['sharpe_ratio_hedged']), abs(metrics['sharpe_ratio_unhedged']))
-        max_profit_ratio = max(metrics['profitable_days_ratio_hedged'], metrics['profitable_days_ratio_unhedged'])
-
-        hedged_values = [
-            1 - (metrics['hedged_volatility'] / max_volatility) if max_volatility > 0 else 0,  # 波动率越小越好
-            1 - (abs(metrics['max_drawdown_hedged']) / max_drawdown) if max_drawdown > 0 else 0,  # 回撤越小越好
-            1 - (abs(metrics['var_95_hedged']) / max_var) if max_var > 0 else 0,  # VaR越小越好
-            abs(metrics['sharpe_ratio_hedged']) / max_sharpe if max_sharpe > 0 else 0,  # 夏普比率越大越好
-            metrics['profitable_days_ratio_hedged'] / max_profit_ratio if max_profit_ratio > 0 else 0
-        ]
-
-        unhedged_values = [
-            1 - (metrics['unhedged_volatility'] / max_volatility) if max_volatility > 0 else 0,
-            1 - (abs(metrics['max_drawdown_unhedged']) / max_drawdown) if max_drawdown > 0 else 0,
-            1 - (abs(metrics['var_95_unhedged']) / max_var) if max_var > 0 else 0,
-            abs(metrics['sharpe_ratio_unhedged']) / max_sharpe if max_sharpe > 0 else 0,
-            metrics['profitable_days_ratio_unhedged'] / max_profit_ratio if max_profit_ratio > 0 else 0
-        ]
+        # 标准化数值（0-1范围）：两行分别为套保/未套保，各列与 categories 对应
+        raw = np.array([
+            [metrics.hedged_volatility, metrics.max_drawdown_hedged, metrics.var_95_hedged,
+             metrics.sharpe_ratio_hedged, metrics.profitable_days_ratio_hedged],
+            [metrics.unhedged_volatility, metrics.max_drawdown_unhedged, metrics.var_95_unhedged,
+             metrics.sharpe_ratio_unhedged, metrics.profitable_days_ratio_unhedged]
+        ], dtype=np.float64)
+        hedged_values, unhedged_values = _normalize_radar(raw).tolist()
 
         fig = go.Figure()
 
@@ -297,108 +626,67 @@ class Visualizer:
         Returns:
             Plotly图表对象
         """
-        fig = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=('风险降低率 vs 套保比例', '套保有效性 vs 套保比例',
-                          '波动率 vs 套保比例', '夏普比率 vs 套保比例'),
-            vertical_spacing=0.15,
-            horizontal_spacing=0.1
-        )
-
-        # 风险降低率
-        fig.add_trace(
-            go.Scatter(
-                x=sensitivity_data['hedge_ratio'],
-                y=sensitivity_data['risk_reduction'] * 100,
-                mode='lines+markers',
-                name='风险降低率',
-                line=dict(color=self.color_scheme['primary'], width=2),
-                hovertemplate='套保比例: %{x:.4f}<br>风险降低率: %{y:.2f}%<extra></extra>'
-            ),
-            row=1, col=1
+        # 各列只取一次NumPy数组
+        hedge_ratios = sensitivity_data['hedge_ratio'].to_numpy(dtype=np.float64)
+        risk_reduction = sensitivity_data['risk_reduction'].to_numpy(dtype=np.float64)
+        effectiveness = sensitivity_data['effectiveness'].to_numpy(dtype=np.float64)
+        volatility = sensitivity_data['volatility'].to_numpy(dtype=np.float64)
+
+        # 图表数据（显示精度允许时降为float32）
+        ratio_axis = _compact_floats(hedge_ratios, 4)
+
+        fig = self._figure_from_skeleton('sensitivity')
+
+        # 夏普比率（计算；波动率为0时记为0，避免出现inf/NaN）
+        sharpe_ratios = np.divide(risk_reduction, volatility,
+                                  out=np.zeros_like(risk_reduction), where=volatility > 0)
+
+        # 四个子图的折线共用同一套轨迹参数：(数值, 名称, 颜色, 小数位, 行, 列)
+        line_specs = (
+            (risk_reduction * 100, '风险降低率', 'primary', 2, 1, 1),
+            (effectiveness * 100, '套保有效性', 'success', 2, 1, 2),
+            (volatility, '波动率', 'warning', 4, 2, 1),
+            (sharpe_ratios, '风险调整收益', 'info', 4, 2, 2)
         )
+        for values, name, color, decimals, row, col in line_specs:
+            fig.add_trace(
+                go.Scatter(
+                    x=ratio_axis,
+                    y=_compact_floats(values, decimals),
+                    mode='lines+markers',
+                    name=name,
+                    line=dict(color=self.color_scheme[color], width=2),
+                    showlegend=(row, col) == (1, 1),
+                    hovertemplate=self._HT_SENSITIVITY[name]
+                ),
+                row=row, col=col
+            )
 
         # 标记最优比例
-        optimal_idx = (sensitivity_data['hedge_ratio'] - optimal_ratio).abs().idxmin()
+        optimal_pos = int(np.argmin(np.abs(hedge_ratios - optimal_ratio)))
         fig.add_trace(
             go.Scatter(
-                x=[sensitivity_data.loc[optimal_idx, 'hedge_ratio']],
-                y=[sensitivity_data.loc[optimal_idx, 'risk_reduction'] * 100],
+                x=[hedge_ratios[optimal_pos]],
+                y=[risk_reduction[optimal_pos] * 100],
                 mode='markers',
                 name='最优比例',
                 marker=dict(color=self.color_scheme['danger'], size=10),
-                hovertemplate='最优套保比例: %{x:.4f}<extra></extra>'
+                hovertemplate=self._HT_OPTIMAL_RATIO
             ),
             row=1, col=1
         )
 
-        # 套保有效性
-        fig.add_trace(
-            go.Scatter(
-                x=sensitivity_data['hedge_ratio'],
-                y=sensitivity_data['effectiveness'] * 100,
-                mode='lines+markers',
-                name='套保有效性',
-                line=dict(color=self.color_scheme['success'], width=2),
-                showlegend=False,
-                hovertemplate='套保比例: %{x:.4f}<br>套保有效性: %{y:.2f}%<extra></extra>'
-            ),
-            row=1, col=2
-        )
-
-        # 波动率
-        fig.add_trace(
-            go.Scatter(
-                x=sensitivity_data['hedge_ratio'],
-                y=sensitivity_data['volatility'],
-                mode='lines+markers',
-                name='波动率',
-                line=dict(color=self.color_scheme['warning'], width=2),
-                showlegend=False,
-                hovertemplate='套保比例: %{x:.4f}<br>波动率: %{y:.4f}<extra></extra>'
-            ),
-            row=2, col=1
-        )
-
-        # 夏普比率（计算）
-        sharpe_ratios = sensitivity_data['risk_reduction'] / sensitivity_data['volatility']
-        fig.add_trace(
-            go.Scatter(
-                x=sensitivity_data['hedge_ratio'],
-                y=sharpe_ratios,
-                mode='lines+markers',
-                name='风险调整收益',
-                line=dict(color=self.color_scheme['info'], width=2),
-                showlegend=False,
-                hovertemplate='套保比例: %{x:.4f}<br>风险调整收益: %{y:.4f}<extra></extra>'
-            ),
-            row=2, col=2
-        )
-
-        # 添加最优比例垂直线
-        for row in [1, 2]:
-            for col in [1, 2]:
-                fig.add_vline(
-                    x=optimal_ratio,
-                    line_dash="dash",
-                    line_color="red",
-                    opacity=0.5,
-                    row=row, col=col
-                )
-
-        fig.update_layout(
-            title='套保比例敏感性分析',
-            height=700,
-            hovermode='x'
-        )
-
-        # 设置轴标签
-        fig.update_xaxes(title_text="套保比例", row=2, col=1)
-        fig.update_xaxes(title_text="套保比例", row=2, col=2)
-        fig.update_yaxes(title_text="风险降低率 (%)", row=1, col=1)
-        fig.update_yaxes(title_text="套保有效性 (%)", row=1, col=2)
-        fig.update_yaxes(title_text="波动率", row=2, col=1)
-        fig.update_yaxes(title_text="风险调整收益", row=2, col=2)
+        # 添加最优比例垂直线（四个子图的竖线一次性写入布局）
+        fig.update_layout(shapes=[
+            dict(
+                type='line',
+                xref=axis_x, yref=f"{axis_y} domain",
+                x0=optimal_ratio, x1=optimal_ratio, y0=0, y1=1,
+                line=dict(dash='dash', color='red'),
+                opacity=0.5
+            )
+            for axis_x, axis_y in (('x', 'y'), ('x2', 'y2'), ('x3', 'y3'), ('x4', 'y4'))
+        ])
 
         return fig
 
@@ -440,7 +728,7 @@ class Visualizer:
             x=categories,
             y=normal_values,
             marker_color=self.color_scheme['success'],
-            hovertemplate='指标: %{x}<br>数值: %{y:.2f}<extra></extra>'
+            hovertemplate=self._HT_METRIC_VALUE
         ))
 
         # 压力时期
@@ -449,7 +737,7 @@ class Visualizer:
             x=categories,
             y=stress_values,
             marker_color=self.color_scheme['danger'],
-            hovertemplate='指标: %{x}<br>数值: %{y:.2f}<extra></extra>'
+            hovertemplate=self._HT_METRIC_VALUE
         ))
 
         fig.update_layout(
@@ -469,69 +757,8 @@ class Visualizer:
         Args:
             summary: 绩效摘要字典
         """
-        # 创建指标卡片
-        col1, col2, col3, col4 = st.columns(4)
-
-        with col1:
-            st.metric(
-                label="套保总盈亏",
-                value=summary['盈亏表现']['套保总盈亏'],
-                delta=summary['盈亏表现']['套保优势']
-            )
-
-        with col2:
-            st.metric(
-                label="风险降低率",
-                value=summary['风险控制']['波动率降低'],
-                delta=None
-            )
-
-        with col3:
-            st.metric(
-                label="套保有效性",
-                value=summary['风险控制']['套保有效性'],
-                delta=None
-            )
-
-        with col4:
-            st.metric(
-                label="夏普比率",
-                value=summary['其他指标']['夏普比率（套保）'],
-                delta=None
-            )
-
-        # 显示详细表格
-        st.subheader("详细绩效指标")
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.markdown("**盈亏表现**")
-            pnl_data = {
-                '指标': ['套保总盈亏', '未套保总盈亏', '套保优势', '平均每日盈亏(套保)', '平均每日盈亏(未套保)'],
-                '数值': [
-                    summary['盈亏表现']['套保总盈亏'],
-                    summary['盈亏表现']['未套保总盈亏'],
-                    summary['盈亏表现']['套保优势'],
-                    summary['盈亏表现']['平均每日盈亏（套保）'],
-                    summary['盈亏表现']['平均每日盈亏（未套保）']
-                ]
-            }
-            st.dataframe(pd.DataFrame(pnl_data), hide_index=True)
-
-        with col2:
-            st.markdown("**风险控制**")
-            risk_data = {
-                '指标': ['套保波动率', '未套保波动率', '波动率降低', '最大回撤(套保)', '最大回撤(未套保)'],
-                '数值': [
-                    summary['风险控制']['套保波动率'],
-                    summary['风险控制']['未套保波动率'],
-                    summary['风险控制']['波动率降低'],
-                    summary['风险控制']['最大回撤（套保）'],
-                    summary['风险控制']['最大回撤（未套保）']
-                ]
-            }
-            st.dataframe(pd.DataFrame(risk_data), hide_index=True)
+        _render_metric_cards(summary)
+        _render_detail_tables(summary)
 
     def create_echart_price_comparison(self, data: pd.DataFrame):
         """
@@ -543,16 +770,20 @@ class Visualizer:
         Returns:
             ECharts图表对象
         """
+        # pyecharts仅此处使用，调用时再导入，缩短模块导入时间
+        import pyecharts.options as opts
+        from pyecharts.charts import Line
+
         line = Line()
 
-        # 添加X轴数据
-        x_data = data['date'].dt.strftime('%Y-%m-%d').tolist()
+        # 添加X轴数据（一次向量化格式化日期）
+        x_data = np.datetime_as_string(data['date'].to_numpy(dtype='datetime64[D]'), unit='D').tolist()
 
         # 添加现货价格线
         line.add_xaxis(x_data)
         line.add_yaxis(
             "现货价格",
-            data['spot_price'].round(2).tolist(),
+            np.round(data['spot_price'].to_numpy(dtype=np.float64), 2).tolist(),
             color="#1f77b4",
             linestyle_opts=opts.LineStyleOpts(width=2),
             label_opts=opts.LabelOpts(is_show=False)
@@ -561,7 +792,7 @@ class Visualizer:
         # 添加期货价格线
         line.add_yaxis(
             "期货价格",
-            data['future_price'].round(2).tolist(),
+            np.round(data['future_price'].to_numpy(dtype=np.float64), 2).tolist(),
             color="#ff7f0e",
             linestyle_opts=opts.LineStyleOpts(width=2),
             label_opts=opts.LabelOpts(is_show=False)